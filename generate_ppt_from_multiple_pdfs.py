@@ -25,8 +25,7 @@ from step2_question_parsing import (
     save_parsed_questions,
     create_preview
 )
-from step3_pptx_new import PPTXGenerator, load_parsed_questions
-from pptx import Presentation
+from step3_pptx_new import PPTXGenerator, load_parsed_questions, get_unique_output_filename
 
 
 def parse_pdf_arguments(args: list[str]) -> list[str]:
@@ -175,36 +174,6 @@ def run_step2_multiple(pdf_contents: list[tuple[str, str]], start_question_numbe
     return True, questions
 
 
-def get_unique_output_filename(base_name: str, folder: str = "PPTs") -> str:
-    """
-    Get a unique output filename by adding a number suffix if file exists.
-    
-    Args:
-        base_name: Base filename (without extension)
-        folder: Output folder name
-        
-    Returns:
-        Unique filename path
-    """
-    folder_path = Path(folder)
-    folder_path.mkdir(exist_ok=True)
-    
-    output_file = folder_path / f"{base_name}.pptx"
-    
-    # If file doesn't exist, return it
-    if not output_file.exists():
-        return str(output_file)
-    
-    # If file exists, add number suffix
-    counter = 1
-    while True:
-        output_file = folder_path / f"{base_name}_{counter}.pptx"
-        if not output_file.exists():
-            print(f"[INFO] Output file already exists, using: {output_file.name}")
-            return str(output_file)
-        counter += 1
-
-
 def run_step3_multiple(pdf_name: str, questions: list, include_answers: bool = True) -> str:
     """
     Run Step 3: PPTX Generation from combined questions
@@ -243,17 +212,27 @@ def run_step3_multiple(pdf_name: str, questions: list, include_answers: bool = T
     generator = PPTXGenerator()
     
     print("[INFO] Creating PowerPoint presentation...")
-    generator.generate(questions, output_file, include_answers=include_answers)
-    
-    # Verify output
     try:
-        verify_prs = Presentation(output_file)
-        num_slides = len(verify_prs.slides)
-        print(f"[OK] Step 3 complete: {num_slides} slides generated")
-        return output_file
+        generator.generate(questions, output_file, include_answers=include_answers)
     except Exception as e:
-        print(f"[WARNING] Could not verify output file: {e}")
-        return output_file
+        print(f"[ERROR] Failed to generate presentation: {e}")
+        Path(output_file).unlink(missing_ok=True)  # Free the reserved name for the next run
+        return None
+    
+    # Verify output (slides are counted in memory; the file only needs to exist and be non-empty)
+    try:
+        file_size = Path(output_file).stat().st_size
+    except OSError as e:
+        print(f"[ERROR] Could not verify output file: {e}")
+        return None
+    if not file_size:
+        print("[ERROR] Output file is empty")
+        Path(output_file).unlink(missing_ok=True)
+        return None
+    
+    num_slides = len(generator.prs.slides)
+    print(f"[OK] Step 3 complete: {num_slides} slides generated")
+    return output_file
 
 
 def main():
@@ -277,6 +256,9 @@ def main():
         print("\nNote: PDF files can be in current directory or provide full/relative paths")
         sys.exit(1)
     
+    # Create the output directory once up front (Step 2's save helpers only create it if it is missing)
+    Path("output").mkdir(parents=True, exist_ok=True)
+    
     # Parse flags FIRST to identify flag values that should be skipped
     include_answers = True
     start_question_number = 1
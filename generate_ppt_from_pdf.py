@@ -8,8 +8,14 @@ Combines all three steps into a single script:
 Usage:
     python generate_ppt_from_pdf.py "input.pdf"
     python generate_ppt_from_pdf.py "Adobe-Scan-03-Nov-2025.pdf"
+    python generate_ppt_from_pdf.py "papers/" --workers 4       # Batch: every PDF in a folder
+    python generate_ppt_from_pdf.py "papers/*.pdf" --rate-limit 2  # Batch: glob pattern
 """
 import sys
+import glob
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from step1_pdf_extraction import (
     get_api_key as get_api_key_step1,
@@ -25,79 +31,149 @@ from step2_question_parsing import (
     save_parsed_questions,
     create_preview
 )
-from step3_pptx_new import PPTXGenerator, load_parsed_questions
-from pptx import Presentation
+from step3_pptx_new import PPTXGenerator, load_parsed_questions, get_unique_output_filename
 
 
-def run_step1(pdf_path: str, extract_year: bool = False) -> tuple:
+# Background pool for output file writes, so saving results overlaps with the next step
+_IO_POOL = ThreadPoolExecutor(max_workers=2)
+_pending_writes = []  # Futures for writes that haven't been confirmed yet
+
+
+def submit_write(func, *args):
+    """
+    Run a file-writing function on the background I/O pool.
+    
+    Args:
+        func: Function that writes a file
+        *args: Arguments passed to func
+        
+    Returns:
+        Future for the write
+    """
+    future = _IO_POOL.submit(func, *args)
+    _pending_writes.append(future)
+    return future
+
+
+def wait_for_pending_writes() -> bool:
+    """
+    Block until all background writes have finished.
+    
+    Returns:
+        True if every write succeeded, False if any failed
+    """
+    all_ok = True
+    while _pending_writes:
+        future = _pending_writes.pop(0)
+        try:
+            future.result()
+        except Exception as e:
+            print(f"[ERROR] Background file write failed: {e}")
+            all_ok = False
+    return all_ok
+
+
+@dataclass(frozen=True)
+class PipelineCtx:
+    """
+    Paths and names for one PDF going through the pipeline, computed once.
+    """
+    pdf_path: Path
+    pdf_name: str
+    output_dir: Path = Path("output")
+    
+    @classmethod
+    def from_pdf(cls, pdf_path: str) -> "PipelineCtx":
+        """
+        Build the context for a PDF file.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            PipelineCtx for the PDF
+        """
+        pdf_path = Path(pdf_path)
+        return cls(pdf_path=pdf_path, pdf_name=pdf_path.stem)
+    
+    @property
+    def extracted_txt(self) -> Path:
+        """Step 1 output: extracted text file."""
+        return self.output_dir / f"extracted_pdf_content_{self.pdf_name}.txt"
+    
+    @property
+    def parsed_json(self) -> Path:
+        """Step 2 output: parsed questions JSON file."""
+        return self.output_dir / f"parsed_questions_{self.pdf_name}.json"
+    
+    @property
+    def preview_txt(self) -> Path:
+        """Step 2 output: human-readable preview of parsed questions."""
+        return self.output_dir / f"parsed_questions_{self.pdf_name}_preview.txt"
+
+
+def run_step1(ctx: PipelineCtx, extract_year: bool = False) -> tuple:
     """
     Run Step 1: PDF Content Extraction
     
     Args:
-        pdf_path: Path to PDF file
+        ctx: Pipeline context for the PDF
         extract_year: Whether to extract exam information (default: False)
         
     Returns:
-        Tuple of (success: bool, pdf_name: str, extracted_text: str)
+        Tuple of (success: bool, extracted_text: str)
     """
     print("\n" + "=" * 60)
     print("STEP 1: PDF CONTENT EXTRACTION")
     print("=" * 60)
     print()
     
-    # Extract PDF name
-    pdf_name = Path(pdf_path).stem
+    pdf_path = ctx.pdf_path
     print(f"[INFO] Processing PDF: {pdf_path}")
-    print(f"[INFO] PDF name: {pdf_name}")
+    print(f"[INFO] PDF name: {ctx.pdf_name}")
     if extract_year:
         print(f"[INFO] Exam information extraction enabled")
     print()
     
     # Check if PDF exists
-    if not Path(pdf_path).exists():
+    if not pdf_path.exists():
         print(f"[ERROR] PDF file not found: {pdf_path}")
-        return False, pdf_name, None
+        return False, None
     
     # Get API key
     api_key = get_api_key_step1()
     if not api_key:
         print("[ERROR] API key not found!")
         print("\nPlease provide API key in config.yaml")
-        return False, pdf_name, None
+        return False, None
     
     # Extract text
     print("[INFO] Sending PDF to Claude API for extraction...")
     print("[INFO] This may take 30-60 seconds...")
-    extracted_text = extract_with_llm(pdf_path, api_key, extract_year)
+    extracted_text = extract_with_llm(str(pdf_path), api_key, extract_year)
     
     if not extracted_text:
         print("[ERROR] Failed to extract content from PDF")
-        return False, pdf_name, None
+        return False, None
     
     # Analyze content
     issues, good_signs = analyze_content(extracted_text)
     
-    # Save extracted text
-    output_file = f"output/extracted_pdf_content_{pdf_name}.txt"
-    save_extracted_text(extracted_text, output_file)
-    
-    # Save PDF name for next steps
-    pdf_name_file = Path("output/current_pdf_name.txt")
-    pdf_name_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(pdf_name_file, 'w', encoding='utf-8') as f:
-        f.write(pdf_name)
+    # Save extracted text in the background
+    submit_write(save_extracted_text, extracted_text, str(ctx.extracted_txt))
     
     print(f"[OK] Step 1 complete: {len(extracted_text):,} characters extracted")
-    return True, pdf_name, extracted_text
+    return True, extracted_text
 
 
-def run_step2(pdf_name: str, extract_year: bool = False) -> tuple:
+def run_step2(ctx: PipelineCtx, extract_year: bool = False, content: str = None) -> tuple:
     """
     Run Step 2: Question Parsing & Slide Structuring
     
     Args:
-        pdf_name: PDF name (without extension)
+        ctx: Pipeline context for the PDF
         extract_year: Whether to extract exam information (default: False)
+        content: Extracted text from Step 1; if None, it is loaded from Step 1's output file
         
     Returns:
         Tuple of (success: bool, questions: list)
@@ -107,13 +183,15 @@ def run_step2(pdf_name: str, extract_year: bool = False) -> tuple:
     print("=" * 60)
     print()
     
-    # Input file from Step 1
-    input_file = f"output/extracted_pdf_content_{pdf_name}.txt"
+    if content is None:
+        # Input file from Step 1 (make sure its background write has finished)
+        input_file = ctx.extracted_txt
+        wait_for_pending_writes()
     
-    if not Path(input_file).exists():
-        print(f"[ERROR] Input file not found: {input_file}")
-        print("[INFO] Please run Step 1 first")
-        return False, None
+        if not input_file.exists():
+            print(f"[ERROR] Input file not found: {input_file}")
+            print("[INFO] Please run Step 1 first")
+            return False, None
     
     # Get API key
     api_key = get_api_key_step2()
@@ -121,15 +199,19 @@ def run_step2(pdf_name: str, extract_year: bool = False) -> tuple:
         print("[ERROR] API key not found!")
         return False, None
     
-    # Load extracted content
-    print(f"[INFO] Loading extracted content from: {input_file}")
-    content = load_extracted_content(input_file)
+    if content is None:
+        # Load extracted content
+        print(f"[INFO] Loading extracted content from: {input_file}")
+        content = load_extracted_content(str(input_file))
     
-    if not content:
-        print("[ERROR] Failed to load extracted content")
-        return False, None
+        if not content:
+            print("[ERROR] Failed to load extracted content")
+            return False, None
     
-    print(f"[OK] Loaded {len(content):,} characters of content")
+        print(f"[OK] Loaded {len(content):,} characters of content")
+    else:
+        # Content handed over from Step 1 in memory - no disk round-trip
+        print(f"[OK] Using {len(content):,} characters of content from Step 1")
     
     # Parse questions
     print("[INFO] Sending content to Claude API for parsing...")
@@ -153,56 +235,40 @@ def run_step2(pdf_name: str, extract_year: bool = False) -> tuple:
     else:
         print("[OK] All questions validated successfully")
     
-    # Save parsed questions
-    output_file = f"output/parsed_questions_{pdf_name}.json"
-    save_parsed_questions(questions, output_file)
-    
-    # Create preview
-    preview_file = f"output/parsed_questions_{pdf_name}_preview.txt"
-    create_preview(questions, preview_file)
+    # Save parsed questions and preview in the background (Step 3 gets questions in memory)
+    submit_write(save_parsed_questions, questions, str(ctx.parsed_json))
+    submit_write(create_preview, questions, str(ctx.preview_txt))
     
     print(f"[OK] Step 2 complete: {stats['total_questions']} questions, {stats['total_slides']} slides")
     return True, questions
 
 
-def get_unique_output_filename(base_name: str, folder: str = "PPTs") -> str:
+def count_slides(questions: list, include_answers: bool = True) -> int:
     """
-    Get a unique output filename by adding a number suffix if file exists.
+    Count the slides that will be generated for a list of questions.
     
     Args:
-        base_name: Base filename (without extension)
-        folder: Output folder name
+        questions: Parsed questions
+        include_answers: Whether answer slides are counted (default: True)
         
     Returns:
-        Unique filename path
+        Number of slides
     """
-    folder_path = Path(folder)
-    folder_path.mkdir(exist_ok=True)
-    
-    output_file = folder_path / f"{base_name}.pptx"
-    
-    # If file doesn't exist, return it
-    if not output_file.exists():
-        return str(output_file)
-    
-    # If file exists, add number suffix
-    counter = 1
-    while True:
-        output_file = folder_path / f"{base_name}_{counter}.pptx"
-        if not output_file.exists():
-            print(f"[INFO] Output file already exists, using: {output_file.name}")
-            return str(output_file)
-        counter += 1
+    return sum(1 for q in questions for slide in q.get('slides', ())
+               if include_answers or slide.get('slide_type') != 'answer')
 
 
-def run_step3(pdf_name: str, include_answers: bool = True, start_question_number: int = 1) -> str:
+def run_step3(ctx: PipelineCtx, include_answers: bool = True, start_question_number: int = 1,
+              questions: list = None, total_slides: int = None) -> str:
     """
     Run Step 3: PPTX Generation
     
     Args:
-        pdf_name: PDF name (without extension)
+        ctx: Pipeline context for the PDF
         include_answers: Whether to include answer slides (default: True)
         start_question_number: Starting question number (default: 1)
+        questions: Parsed questions from Step 2; if None, they are loaded from Step 2's JSON file
+        total_slides: Slide count if already known; if None, it is counted here
         
     Returns:
         Output file path, or None if failed
@@ -212,48 +278,211 @@ def run_step3(pdf_name: str, include_answers: bool = True, start_question_number
     print("=" * 60)
     print()
     
-    # Input file from Step 2
-    input_file = f"output/parsed_questions_{pdf_name}.json"
+    if questions is None:
+        # Input file from Step 2 (make sure its background write has finished)
+        wait_for_pending_writes()
     
-    # Load parsed questions
-    questions = load_parsed_questions(input_file)
+        # Load parsed questions
+        questions = load_parsed_questions(str(ctx.parsed_json))
     
     if not questions:
         print("[ERROR] Failed to load parsed questions")
         return None
     
     # Count slides (excluding answers if include_answers is False)
-    if include_answers:
-        total_slides = sum(len(q.get('slides', [])) for q in questions)
-    else:
-        # Count only non-answer slides
-        total_slides = 0
-        for q in questions:
-            for slide in q.get('slides', []):
-                if slide.get('slide_type') != 'answer':
-                    total_slides += 1
+    if total_slides is None:
+        total_slides = count_slides(questions, include_answers)
     
     answer_status = "with answers" if include_answers else "without answers"
     print(f"[INFO] Will generate {total_slides} slides from {len(questions)} questions ({answer_status})")
     
     # Get unique output filename (handles existing files)
-    output_file = get_unique_output_filename(pdf_name)
+    output_file = get_unique_output_filename(ctx.pdf_name)
     
     # Generate PPTX
     generator = PPTXGenerator()
     
     print("[INFO] Creating PowerPoint presentation...")
-    generator.generate(questions, output_file, include_answers=include_answers, start_question_number=start_question_number)
-    
-    # Verify output
     try:
-        verify_prs = Presentation(output_file)
-        num_slides = len(verify_prs.slides)
-        print(f"[OK] Step 3 complete: {num_slides} slides generated")
-        return output_file
+        generator.generate(questions, output_file, include_answers=include_answers, start_question_number=start_question_number)
     except Exception as e:
-        print(f"[WARNING] Could not verify output file: {e}")
-        return output_file
+        print(f"[ERROR] Failed to generate presentation: {e}")
+        Path(output_file).unlink(missing_ok=True)  # Free the reserved name for the next run
+        return None
+    
+    # Verify output (slides are counted in memory; the file only needs to exist and be non-empty)
+    try:
+        file_size = Path(output_file).stat().st_size
+    except OSError as e:
+        print(f"[ERROR] Could not verify output file: {e}")
+        return None
+    if not file_size:
+        print("[ERROR] Output file is empty")
+        Path(output_file).unlink(missing_ok=True)
+        return None
+    
+    num_slides = len(generator.prs.slides)
+    print(f"[OK] Step 3 complete: {num_slides} slides generated")
+    return output_file
+
+
+def expand_pdf_inputs(pdf_arg: str) -> list[str]:
+    """
+    Expand a directory or glob pattern into a sorted list of PDF paths.
+    
+    Args:
+        pdf_arg: Directory path or glob pattern (e.g., "papers/" or "papers/*.pdf")
+        
+    Returns:
+        List of PDF file paths (empty if nothing matched)
+    """
+    if Path(pdf_arg).is_dir():
+        pattern = str(Path(pdf_arg) / "*.pdf")
+    else:
+        pattern = pdf_arg
+    return sorted(p for p in glob.glob(pattern) if p.lower().endswith('.pdf'))
+
+
+def is_batch_input(pdf_arg: str) -> bool:
+    """
+    Check whether the input argument refers to multiple PDFs (directory or glob).
+    
+    Args:
+        pdf_arg: Input argument from the command line
+        
+    Returns:
+        True if the argument is a directory or a glob pattern (an existing file,
+        even one with brackets in its name, is always a single input)
+    """
+    if Path(pdf_arg).is_file():
+        return False
+    return Path(pdf_arg).is_dir() or any(ch in pdf_arg for ch in '*?[')
+
+
+async def run_step1_async(ctx: PipelineCtx, sem: asyncio.Semaphore, index: int,
+                          extract_year: bool = False, rate_limit: float = 0.0) -> tuple:
+    """
+    Run Step 1 for one PDF of a batch without blocking the other PDFs.
+    
+    Args:
+        ctx: Pipeline context for the PDF
+        sem: Semaphore bounding how many extractions run at once
+        index: Position of the PDF in the batch (used to stagger start times)
+        extract_year: Whether to extract exam information (default: False)
+        rate_limit: Minimum seconds between the start of consecutive extractions (default: 0)
+        
+    Returns:
+        Tuple of (success: bool, extracted_text: str)
+    """
+    # Stagger request starts so the batch stays under the API rate limit
+    if rate_limit > 0:
+        await asyncio.sleep(index * rate_limit)
+    
+    async with sem:
+        # run_step1 is blocking network I/O, so run it in a worker thread
+        return await asyncio.to_thread(run_step1, ctx, extract_year)
+
+
+async def run_step1_batch(ctxs: list[PipelineCtx], extract_year: bool = False,
+                          workers: int = 4, rate_limit: float = 0.0) -> list:
+    """
+    Run Step 1 for every PDF in a batch concurrently.
+    
+    Args:
+        ctxs: Pipeline contexts, one per PDF
+        extract_year: Whether to extract exam information (default: False)
+        workers: Maximum number of concurrent extractions (default: 4)
+        rate_limit: Minimum seconds between the start of consecutive extractions (default: 0)
+        
+    Returns:
+        List of run_step1 results (or exceptions) in the same order as ctxs
+    """
+    sem = asyncio.Semaphore(workers)
+    return await asyncio.gather(
+        *[run_step1_async(ctx, sem, i, extract_year, rate_limit) for i, ctx in enumerate(ctxs)],
+        return_exceptions=True  # One bad PDF shouldn't abort the batch
+    )
+
+
+def run_batch(pdf_paths: list[str], include_answers: bool = True, start_question_number: int = 1,
+              extract_year: bool = False, workers: int = 4, rate_limit: float = 0.0) -> tuple:
+    """
+    Generate one PPTX per PDF for a batch of PDFs.
+    Step 1 runs concurrently for all PDFs; Steps 2 and 3 then run per PDF.
+    
+    Args:
+        pdf_paths: List of PDF file paths
+        include_answers: Whether to include answer slides (default: True)
+        start_question_number: Starting question number for each presentation (default: 1)
+        extract_year: Whether to extract exam information (default: False)
+        workers: Maximum number of concurrent extractions (default: 4)
+        rate_limit: Minimum seconds between the start of consecutive extractions (default: 0)
+        
+    Returns:
+        Tuple of (output_files: list[str], failed_pdfs: list[str])
+    """
+    print("=" * 60)
+    print("BATCH PPT GENERATION FROM PDFS")
+    print("=" * 60)
+    print(f"Input PDFs: {len(pdf_paths)} file(s)")
+    for i, path in enumerate(pdf_paths, 1):
+        print(f"  {i}. {path}")
+    print(f"Concurrent extractions: {workers}")
+    if rate_limit > 0:
+        print(f"Rate limit: {rate_limit} seconds between requests")
+    print()
+    
+    # Step 1: Extract all PDFs concurrently
+    ctxs = [PipelineCtx.from_pdf(pdf_path) for pdf_path in pdf_paths]
+    step1_results = asyncio.run(run_step1_batch(ctxs, extract_year, workers, rate_limit))
+    
+    output_files = []
+    failed_pdfs = []
+    for pdf_path, ctx, result in zip(pdf_paths, ctxs, step1_results):
+        if isinstance(result, BaseException):
+            print(f"\n[ERROR] Step 1 failed for {pdf_path}: {result}")
+            failed_pdfs.append(pdf_path)
+            continue
+        
+        success, extracted_text = result
+        if not success:
+            print(f"\n[ERROR] Step 1 failed for {pdf_path}")
+            failed_pdfs.append(pdf_path)
+            continue
+        
+        # Step 2: Parse questions (extracted text is passed in memory)
+        success, questions = run_step2(ctx, extract_year, content=extracted_text)
+        if not success:
+            print(f"\n[ERROR] Step 2 failed for {pdf_path}")
+            failed_pdfs.append(pdf_path)
+            continue
+        
+        # Step 3: Generate PPTX
+        output_file = run_step3(ctx, include_answers=include_answers, start_question_number=start_question_number,
+                                questions=questions)
+        if not output_file:
+            print(f"\n[ERROR] Step 3 failed for {pdf_path}")
+            failed_pdfs.append(pdf_path)
+            continue
+        
+        output_files.append(output_file)
+    
+    # Make sure all intermediate files are on disk before reporting
+    wait_for_pending_writes()
+    
+    # Final summary
+    print("\n" + "=" * 60)
+    print("BATCH GENERATION COMPLETE!")
+    print("=" * 60)
+    print(f"Generated: {len(output_files)}/{len(pdf_paths)} presentation(s)")
+    for output_file in output_files:
+        print(f"  - {output_file}")
+    if failed_pdfs:
+        print(f"Failed: {len(failed_pdfs)} PDF(s)")
+        for pdf_path in failed_pdfs:
+            print(f"  - {pdf_path}")
+    
+    return output_files, failed_pdfs
 
 
 def main():
@@ -265,6 +494,7 @@ def main():
         print("Example: python generate_ppt_from_pdf.py \"large.pdf\" --split-at \"25,50,75\"")
         print("Example: python generate_ppt_from_pdf.py \"previous_year.pdf\" --extract-exam-info")
         print("Example: python generate_ppt_from_pdf.py \"large.pdf\" --split-at \"30,60\" --no-answers --start-number 1 --extract-exam-info")
+        print("Example: python generate_ppt_from_pdf.py \"papers/\" --workers 4 --rate-limit 2")
         print("\nOptions:")
         print("  --no-answers         Exclude answer slides from the presentation")
         print("  --start-number <num> Start numbering questions and answers from this number (default: 1)")
@@ -272,9 +502,15 @@ def main():
         print("                       Use this for large PDFs to avoid connection timeouts")
         print("  --extract-exam-info  Extract and display exam information from previous year question papers")
         print("                       (e.g., [CBSE 2023 (57/1/1)], [CBSE Delhi 2015 [HOTS]])")
+        print("  --workers <num>      Batch mode: number of PDFs extracted concurrently (default: 4)")
+        print("  --rate-limit <secs>  Batch mode: minimum seconds between starting extractions (default: 0)")
         print("\nNote: PDF file can be in current directory or provide full/relative path")
+        print("      Pass a folder or glob pattern (e.g., \"papers/*.pdf\") to generate one PPTX per PDF")
         sys.exit(1)
     
+    # Create the output directory once up front (Step 2's save helpers only create it if it is missing)
+    Path("output").mkdir(parents=True, exist_ok=True)
+    
     pdf_path = sys.argv[1]
     
     # Check for --no-answers flag
@@ -324,6 +560,61 @@ def main():
             print("[ERROR] --split-at must be followed by comma-separated page numbers (e.g., \"25,50,75\")")
             sys.exit(1)
     
+    # Check for --workers flag (batch mode)
+    workers = 4  # Default value
+    if '--workers' in sys.argv:
+        try:
+            idx = sys.argv.index('--workers')
+            if idx + 1 < len(sys.argv):
+                workers = int(sys.argv[idx + 1])
+                if workers < 1:
+                    print("[ERROR] --workers must be at least 1")
+                    sys.exit(1)
+            else:
+                print("[ERROR] --workers requires a number argument")
+                sys.exit(1)
+        except ValueError:
+            print("[ERROR] --workers must be followed by a valid integer")
+            sys.exit(1)
+    
+    # Check for --rate-limit flag (batch mode)
+    rate_limit = 0.0  # Default value
+    if '--rate-limit' in sys.argv:
+        try:
+            idx = sys.argv.index('--rate-limit')
+            if idx + 1 < len(sys.argv):
+                rate_limit = float(sys.argv[idx + 1])
+                if rate_limit < 0:
+                    print("[ERROR] --rate-limit cannot be negative")
+                    sys.exit(1)
+            else:
+                print("[ERROR] --rate-limit requires a number of seconds")
+                sys.exit(1)
+        except ValueError:
+            print("[ERROR] --rate-limit must be followed by a number of seconds")
+            sys.exit(1)
+    
+    # Batch mode: directory or glob pattern of PDFs
+    if is_batch_input(pdf_path):
+        pdf_paths = expand_pdf_inputs(pdf_path)
+        if not pdf_paths:
+            print(f"[ERROR] No PDF files found for: {pdf_path}")
+            sys.exit(1)
+        if manual_split_pages:
+            print("[WARNING] --split-at is ignored in batch mode")
+        output_files, failed_pdfs = run_batch(
+            pdf_paths,
+            include_answers=include_answers,
+            start_question_number=start_question_number,
+            extract_year=extract_year,
+            workers=workers,
+            rate_limit=rate_limit
+        )
+        if not output_files:
+            print("\n[ERROR] No presentations were generated. Exiting.")
+            sys.exit(1)
+        return
+    
     # Check if PDF exists (try current directory first, then as-is)
     if not Path(pdf_path).exists():
         # Try in current directory
@@ -419,32 +710,30 @@ def main():
     print()
     
     # Step 1: Extract PDF content
-    success, pdf_name, extracted_text = run_step1(pdf_path, extract_year)
+    ctx = PipelineCtx.from_pdf(pdf_path)
+    success, extracted_text = run_step1(ctx, extract_year)
     if not success:
         print("\n[ERROR] Step 1 failed. Exiting.")
         sys.exit(1)
     
-    # Step 2: Parse questions
-    success, questions = run_step2(pdf_name, extract_year)
+    # Step 2: Parse questions (extracted text is passed in memory)
+    success, questions = run_step2(ctx, extract_year, content=extracted_text)
     if not success:
         print("\n[ERROR] Step 2 failed. Exiting.")
         sys.exit(1)
     
-    # Step 3: Generate PPTX
-    output_file = run_step3(pdf_name, include_answers=include_answers, start_question_number=start_question_number)
+    # Count slides once for Step 3 and the final summary (excluding answers if needed)
+    total_slides = count_slides(questions, include_answers)
+    
+    # Step 3: Generate PPTX (parsed questions are passed in memory)
+    output_file = run_step3(ctx, include_answers=include_answers, start_question_number=start_question_number,
+                            questions=questions, total_slides=total_slides)
     if not output_file:
         print("\n[ERROR] Step 3 failed. Exiting.")
         sys.exit(1)
     
-    # Count actual slides generated (excluding answers if needed)
-    if include_answers:
-        total_slides = sum(len(q.get('slides', [])) for q in questions)
-    else:
-        total_slides = 0
-        for q in questions:
-            for slide in q.get('slides', []):
-                if slide.get('slide_type') != 'answer':
-                    total_slides += 1
+    # Make sure all intermediate files are on disk before reporting
+    wait_for_pending_writes()
     
     # Final summary
     print("\n" + "=" * 60)
@@ -8,281 +8,1100 @@ This step helps us verify:
 3. Are questions visible and properly extracted?
 """
 from anthropic import Anthropic  # Import Anthropic SDK for Claude API
+from anthropic import APIConnectionError, APIStatusError, RateLimitError  # Transient API errors
 from pathlib import Path  # For file path operations
 import sys  # For system operations and exit
 import base64  # For encoding PDF to base64
+import hashlib  # For hashing cache keys
+import sqlite3  # For the persistent LLM response cache
+import time  # For cache entry timestamps
+import io  # For in-memory image buffers
+import asyncio  # For concurrent page requests
+import re  # For content analysis patterns
+import os  # For CPU count
+import random  # For retry jitter
+import threading  # For guarding the in-memory cache tier
+from functools import lru_cache  # For sharing one extractor per API key
+try:
+    import streamlit as st  # For Streamlit Cloud secrets
+except ImportError:
+    st = None
+try:
+    import yaml  # YAML parser for config file
+except ImportError:
+    yaml = None
 
 
-def load_pdf_as_base64(pdf_path: str) -> str:
+# Claude model used for all extraction requests (also part of the cache key)
+CLAUDE_MODEL = "claude-sonnet-4-5-20250929"
+
+# Title line of the header written at the top of extracted text files (Step 2 skips past it)
+EXTRACTED_CONTENT_TITLE = "EXTRACTED PDF CONTENT (via LLM)"
+
+# Beta flag for Anthropic's Files API (large PDFs are uploaded once and referenced by ID)
+FILES_API_BETA = "files-api-2025-04-14"
+FILES_API_MIN_BYTES = 4 * 1024 * 1024  # Smaller PDFs are sent inline (an upload adds two round trips)
+
+# API key found by get_api_key() (empty until a key is found, so a missing key is looked up again)
+_api_key = ""
+
+# Default location of the persistent LLM response cache
+LLM_CACHE_PATH = "output/.cache/llm_cache.sqlite"
+
+# Responses also kept in process memory (e.g. across Streamlit reruns), oldest dropped first
+LLM_MEMORY_CACHE_ENTRIES = 256
+
+# Number of pages sent to Claude Vision API concurrently (kept low to stay within rate limits)
+PAGE_CONCURRENCY = 5
+
+# Large PDFs are split into chunks of this many pages and extracted concurrently
+CHUNK_PAGE_THRESHOLD = 20  # Only chunk PDFs with more pages than this
+PAGES_PER_CHUNK = 5
+CHUNK_CONCURRENCY = 5  # Chunk requests in flight at once
+CHUNK_MAX_TOKENS = 8000  # Output budget per chunk (well under the single-request cap)
+
+# Number of PDFs extracted concurrently by extract_multiple_pdfs() (each may send its own chunk requests)
+PDF_CONCURRENCY = 3
+
+# Retry policy for rate limits, overloaded and server errors (exponential backoff + jitter)
+API_MAX_ATTEMPTS = 6
+API_RETRY_INITIAL_WAIT = 1.0  # Seconds before the first retry
+API_RETRY_MAX_WAIT = 60.0  # Upper bound on any single wait
+_RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+_RETRYABLE_ERROR_TYPES = {"rate_limit_error", "overloaded_error", "api_error"}  # Errors sent mid-stream
+
+# Resolution used when rendering pages for the image fallback
+PAGE_IMAGE_DPI = 150
+
+# Instruction sent with every page image in the image fallback (kept constant so it can be prompt-cached)
+PAGE_EXTRACTION_PROMPT = "Extract all text content from this page. Include questions, options, tables, and any other text. Maintain formatting where possible."
+
+# Pre-compiled patterns used by analyze_content()
+# Matches: Q1, Q2, Question 1, etc. at start of line
+_QUESTION_START_RE = re.compile(r'(?:^|\n)\s*(?:q\d+|question\s+\d+)', re.MULTILINE | re.IGNORECASE)
+# Matches every indicator substring checked in analyze_content, in a single pass
+_INDICATOR_RE = re.compile(r'q1|q2|question|\?|ans\.|answer|option|a\)|b\)', re.IGNORECASE)
+
+
+class LLMCache:
     """
-    Load PDF file and convert to base64 for API transmission.
+    Persistent on-disk cache for Claude API responses.
+    
+    Responses are stored in a SQLite table keyed by a SHA256 hash of the request
+    inputs (PDF/image bytes + prompt + model), so re-running a step on the same
+    PDF returns the stored text instead of calling the API again. Recent
+    responses are also kept in memory, shared by all instances in the process,
+    so repeats in a long-running app skip the database too.
+    """
+    
+    _memory = {}  # (db_path, key) -> response, in insertion order
+    _memory_lock = threading.Lock()
+    
+    def __init__(self, db_path: str = LLM_CACHE_PATH):
+        """
+        Open (or create) the cache database.
+        
+        Args:
+            db_path: Path to the SQLite cache file
+        """
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, response TEXT, ts INTEGER)"
+            )
+    
+    @staticmethod
+    def make_key(*parts) -> str:
+        """
+        Build a cache key from request inputs.
+        
+        Args:
+            *parts: Strings or bytes that identify the request (data, prompt, model)
+        
+        Returns:
+            Hex SHA256 digest of all parts
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode('utf-8')
+            digest.update(part)
+            digest.update(b'\x00')  # Separator so ("ab", "c") != ("a", "bc")
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> str:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: Cache key from make_key()
+        
+        Returns:
+            Cached response text, or None if not cached
+        """
+        response = self._memory.get((self.db_path, key))
+        if response is not None:
+            return response
+        
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"[WARNING] Could not read LLM cache: {e}")
+            return None
+        
+        if not row:
+            return None
+        self._remember(key, row[0])
+        return row[0]
+    
+    def set(self, key: str, response: str):
+        """
+        Store a response in the cache.
+        
+        Args:
+            key: Cache key from make_key()
+            response: Response text to store
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, ts) VALUES (?, ?, ?)",
+                    (key, response, int(time.time()))
+                )
+        except sqlite3.Error as e:
+            print(f"[WARNING] Could not write LLM cache: {e}")
+        self._remember(key, response)
+    
+    def _remember(self, key: str, response: str):
+        """
+        Keep a response in the in-memory tier, dropping the oldest entry when full.
+        
+        Args:
+            key: Cache key from make_key()
+            response: Response text
+        """
+        with self._memory_lock:
+            self._memory[(self.db_path, key)] = response
+            if len(self._memory) > LLM_MEMORY_CACHE_ENTRIES:
+                del self._memory[next(iter(self._memory))]
+    
+    def get_or_set(self, key: str, fetch_func) -> str:
+        """
+        Return the cached response for key, calling fetch_func on a miss.
+        
+        Args:
+            key: Cache key from make_key()
+            fetch_func: Zero-argument callable that performs the API request
+        
+        Returns:
+            Response text (only non-empty responses are stored)
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        response = fetch_func()
+        if response:
+            self.set(key, response)
+        return response
+
+
+def load_pdf_bytes(pdf_path: str) -> bytes:
+    """
+    Load PDF file as raw bytes (base64 encoding is only done for PDFs sent inline).
     
     Args:
         pdf_path: Path to the PDF file
         
     Returns:
-        Base64-encoded string of PDF content, or None if error
+        PDF file content, or None if error
     """
     try:
-        # Open PDF file in binary read mode
-        with open(pdf_path, 'rb') as f:
-            # Read all bytes from the PDF file
-            pdf_bytes = f.read()
-            # Encode PDF bytes to base64 string for API transmission
-            return base64.b64encode(pdf_bytes).decode('utf-8')
+        return Path(pdf_path).read_bytes()
     except Exception as e:
         # Print error if file reading fails
         print(f"[ERROR] Failed to read PDF: {e}")
         return None
 
 
-def extract_with_llm(pdf_path: str, api_key: str, extract_year: bool = False) -> str:
+def split_pdf_into_chunks(pdf_bytes: bytes, pages_per_chunk: int = PAGES_PER_CHUNK) -> list[bytes]:
     """
-    Extract text content from PDF using Claude API.
-    This is the main extraction function that sends PDF to Claude and gets text back.
+    Split a PDF into in-memory chunks of consecutive pages.
     
     Args:
-        pdf_path: Path to PDF file
-        api_key: Anthropic API key for authentication
-        extract_year: Whether to extract exam information from previous year question papers (default: False)
+        pdf_bytes: PDF file content
+        pages_per_chunk: Number of pages per chunk (default: PAGES_PER_CHUNK)
         
     Returns:
-        Extracted text content as string, or None if extraction fails
+        List of PDF bytes, one per chunk in page order (empty list if splitting fails)
     """
-    # Load PDF and convert to base64 for API
-    print("[INFO] Loading PDF file...")
-    pdf_base64 = load_pdf_as_base64(pdf_path)
+    try:
+        from PyPDF2 import PdfReader, PdfWriter
+    except ImportError:
+        print("[ERROR] PyPDF2 not installed. Install with: pip install PyPDF2")
+        return []
     
-    # Check if PDF was loaded successfully
-    if not pdf_base64:
-        return None
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    chunks = []
+    for start in range(0, len(reader.pages), pages_per_chunk):
+        # Copy this page range into a new in-memory PDF
+        writer = PdfWriter()
+        for page in reader.pages[start:start + pages_per_chunk]:
+            writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        chunks.append(buffer.getvalue())
+    return chunks
+
+
+def _is_retryable_error(e: Exception) -> bool:
+    """
+    Check whether an API error is transient and worth retrying.
     
-    # Inform user that we're sending to API (may take time)
-    print("[INFO] Sending PDF to Claude API for extraction...")
-    print("[INFO] This may take 30-60 seconds...")
+    Args:
+        e: Exception raised by the Anthropic client
+        
+    Returns:
+        True for connection errors, rate limits, overloaded and server errors
+    """
+    if isinstance(e, (APIConnectionError, RateLimitError)):
+        return True
+    if not isinstance(e, APIStatusError):
+        return False
+    if e.status_code in _RETRYABLE_STATUS_CODES:
+        return True
+    # Errors sent as a stream event arrive with the original 200 status
+    body = e.body if isinstance(e.body, dict) else {}
+    error = body.get("error") if isinstance(body.get("error"), dict) else {}
+    return error.get("type") in _RETRYABLE_ERROR_TYPES
+
+
+def _retry_wait_seconds(e: Exception, attempt: int) -> float:
+    """
+    Work out how long to wait before the next attempt.
+    Uses the server's retry-after header when present, otherwise exponential backoff with jitter.
     
-    try:
-        # Initialize Anthropic client with API key
-        client = Anthropic(api_key=api_key)
+    Args:
+        e: The retryable exception
+        attempt: Number of attempts made so far (1 = first attempt failed)
         
-        # Read PDF as binary (needed for document attachment)
-        with open(pdf_path, 'rb') as f:
-            pdf_bytes = f.read()
+    Returns:
+        Seconds to wait
+    """
+    response = getattr(e, "response", None)
+    if response is not None:
+        try:
+            return min(float(response.headers.get("retry-after")), API_RETRY_MAX_WAIT)
+        except (TypeError, ValueError):
+            pass  # Header missing or not a number of seconds
+    
+    wait = API_RETRY_INITIAL_WAIT * (2 ** (attempt - 1))
+    return min(wait + random.uniform(0, API_RETRY_INITIAL_WAIT), API_RETRY_MAX_WAIT)
+
+
+def _call_claude(func, *args, **kwargs):
+    """
+    Call an Anthropic client function, retrying transient errors with backoff.
+    
+    Args:
+        func: Function making the API request (e.g. client.messages.create)
+        *args, **kwargs: Arguments passed to func
         
-        # Build extraction prompt
-        extraction_prompt = """Extract all text content from this PDF. 
+    Returns:
+        Whatever func returns
+    """
+    for attempt in range(1, API_MAX_ATTEMPTS + 1):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt == API_MAX_ATTEMPTS or not _is_retryable_error(e):
+                raise
+            wait = _retry_wait_seconds(e, attempt)
+            print(f"\n[WARNING] {type(e).__name__} from Claude API, retrying in {wait:.1f}s "
+                  f"(attempt {attempt + 1}/{API_MAX_ATTEMPTS})...")
+            time.sleep(wait)
 
-Please extract:
-1. All questions (ignore question numbers in PDF, just extract the question text)
-2. All options (if multiple choice)
-3. Any tables or diagrams mentioned
-4. Answers if provided"""
+
+def _upload_pdf(client, name: str, pdf_bytes: bytes) -> str:
+    """
+    Upload a large PDF once with the Files API, so every attempt of a request
+    references it by ID instead of resending it as base64.
+    
+    Args:
+        client: Anthropic client
+        name: File name for the upload
+        pdf_bytes: PDF file content
         
-        # Add year extraction instruction if enabled
-        if extract_year:
-            extraction_prompt += """
-5. Exam information: If this is a previous year question paper, extract the full exam information (e.g., "[CBSE 2023 (57/1/1)]", "[CBSE Delhi 2015 [HOTS]]", "[CBSE Sample Question Paper 2024]"). Include this at the beginning of the extracted content in the format: "EXAM_INFO: [full exam information]" if found."""
+    Returns:
+        File ID, or None for small PDFs or if the Files API is unavailable (caller sends base64)
+    """
+    if len(pdf_bytes) < FILES_API_MIN_BYTES:
+        return None
+    try:
+        return client.beta.files.upload(file=(name, pdf_bytes, "application/pdf"), betas=[FILES_API_BETA]).id
+    except Exception as e:
+        # Older SDK without Files API, or upload rejected - fall back to inline base64
+        print(f"[INFO] Files API upload not available ({e}), sending PDF as base64")
+        return None
+
+
+def _delete_upload(client, file_id: str):
+    """
+    Remove an uploaded PDF once its request (including retries) is done.
+    
+    Args:
+        client: Anthropic client
+        file_id: File ID from _upload_pdf(), or None (nothing to do)
+    """
+    if not file_id:
+        return
+    try:
+        client.beta.files.delete(file_id, betas=[FILES_API_BETA])
+    except Exception:
+        pass  # A leftover upload is harmless
+
+
+def _pdf_request_parts(client, pdf_bytes: bytes, file_id: str) -> tuple:
+    """
+    Build the document block of a PDF request.
+    
+    Args:
+        client: Anthropic client
+        pdf_bytes: PDF file content (only encoded when there is no upload)
+        file_id: File ID from _upload_pdf(), or None to send the PDF inline
         
-        extraction_prompt += """
+    Returns:
+        Tuple of (messages_client, document: dict, extra_args: dict) - uploaded PDFs
+        go through the beta messages API with the Files API flag in extra_args
+    """
+    if file_id:
+        document = {
+            "type": "document",  # PDF document attachment
+            "source": {"type": "file", "file_id": file_id}  # Uploaded PDF reference
+        }
+        return client.beta, document, {"betas": [FILES_API_BETA]}
+    
+    document = {
+        "type": "document",  # PDF document attachment
+        "source": {
+            "type": "base64",  # Base64 encoding
+            "media_type": "application/pdf",  # PDF MIME type
+            "data": base64.b64encode(pdf_bytes).decode('utf-8')  # Base64-encoded PDF data
+        }
+    }
+    return client, document, {}
 
-Return the extracted content in a clear, structured format. Maintain the order of questions as they appear in the PDF.
 
-Extract all content accurately and completely."""
+def _create_chunk_message(client, i: int, chunk_bytes: bytes, extraction_prompt: str):
+    """
+    Send one PDF chunk to Claude, uploading it first if it is large.
+    
+    Args:
+        client: Anthropic client
+        i: Chunk number (1-indexed, used for the upload name)
+        chunk_bytes: PDF bytes of the chunk
+        extraction_prompt: Extraction instructions
         
-        # Create API request to Claude
-        # We send both a text prompt and the PDF document
-        response = client.messages.create(
-            model="claude-sonnet-4-5-20250929",  # Claude model version
-            max_tokens=16000,  # Maximum response length
+    Returns:
+        Final Message from Claude
+    """
+    file_id = _upload_pdf(client, f"chunk_{i}.pdf", chunk_bytes)
+    messages_client, document, extra_args = _pdf_request_parts(client, chunk_bytes, file_id)
+    try:
+        # Retries reuse the same upload (or the same encoded data)
+        return _call_claude(
+            messages_client.messages.create,
+            model=CLAUDE_MODEL,  # Claude model version
+            max_tokens=CHUNK_MAX_TOKENS,  # Per-chunk response length
             messages=[{
-                "role": "user",  # User message
+                "role": "user",
                 "content": [
                     {
-                        "type": "text",  # Text instruction
-                        "text": extraction_prompt
+                        "type": "text",  # Text instruction (static, placed first so it is cache-eligible)
+                        "text": extraction_prompt,
+                        "cache_control": {"type": "ephemeral"}
                     },
-                    {
-                        "type": "document",  # PDF document attachment
-                        "source": {
-                            "type": "base64",  # Base64 encoding
-                            "media_type": "application/pdf",  # PDF MIME type
-                            "data": pdf_base64  # Base64-encoded PDF data
-                        }
-                    }
+                    document  # PDF chunk attachment
                 ]
-            }]
+            }],
+            **extra_args
         )
+    finally:
+        _delete_upload(client, file_id)
+
+
+async def _extract_chunk_async(client, sem: asyncio.Semaphore, i: int, chunk_bytes: bytes,
+                               extraction_prompt: str, cache: LLMCache) -> str:
+    """
+    Extract text from one PDF chunk using Claude API.
+    
+    Args:
+        client: Anthropic client (shared across chunks)
+        sem: Semaphore bounding the number of in-flight requests
+        i: Chunk number (1-indexed)
+        chunk_bytes: PDF bytes of the chunk
+        extraction_prompt: Extraction instructions
+        cache: LLMCache used to skip chunks that were already extracted
         
-        # Combine all content blocks (in case there are multiple)
-        extracted_text = ""
-        for content_block in response.content:
-            if hasattr(content_block, 'text'):
-                extracted_text += content_block.text
-        
-        # Check stop reason first - handle refusal specifically
-        if hasattr(response, 'stop_reason'):
-            if response.stop_reason == "refusal":
-                print("[WARNING] Claude API refused to process the PDF document attachment.")
-                print("[INFO] This may be due to PDF format or content policy restrictions.")
-                print("[INFO] Automatically trying alternative method: converting PDF to images...")
-                # Try image-based extraction as fallback
-                return extract_with_llm_images(pdf_path, api_key)
-            elif response.stop_reason == "max_tokens":
-                print("[WARNING] Response was truncated due to max_tokens limit!")
-                print("[WARNING] Some content may be missing. Consider increasing max_tokens or splitting the PDF.")
-            elif response.stop_reason:
-                print(f"[INFO] Response stop reason: {response.stop_reason}")
-        
-        # Validate we got content
-        if not extracted_text or len(extracted_text.strip()) < 100:
-            print("[ERROR] Extracted text is too short or empty. Response may have failed.")
-            print(f"[DEBUG] Response content blocks: {len(response.content)}")
-            if hasattr(response, 'stop_reason'):
-                print(f"[DEBUG] Stop reason: {response.stop_reason}")
-                if response.stop_reason == "refusal":
-                    print("[INFO] Trying alternative method: converting PDF to images...")
-                    return extract_with_llm_images(pdf_path, api_key, extract_year)
-            # Show actual response content for debugging
-            if extracted_text:
-                print(f"[DEBUG] Response content preview: {extracted_text[:200]}")
-            return None
-        
-        print(f"[OK] Content extracted successfully: {len(extracted_text):,} characters")
-        return extracted_text
-        
+    Returns:
+        Extracted chunk text, or None if extraction failed
+    """
+    chunk_key = LLMCache.make_key(chunk_bytes, extraction_prompt, CLAUDE_MODEL)
+    cached_text = cache.get(chunk_key)
+    if cached_text:
+        return cached_text
+    
+    try:
+        async with sem:
+            # The blocking client call runs in a worker thread so chunks overlap
+            response = await asyncio.to_thread(_create_chunk_message, client, i, chunk_bytes, extraction_prompt)
     except Exception as e:
-        # Handle API errors
-        print(f"[ERROR] LLM extraction failed: {e}")
-        if "api_key" in str(e).lower() or "authentication" in str(e).lower():
-            # API key issue
-            print("\n[ERROR] API key issue. Please check your API key in config.")
-        elif "file" in str(e).lower() or "attachment" in str(e).lower():
-            # PDF attachment format issue - try alternative method
-            print("\n[INFO] Claude API may not support direct PDF attachments in this format.")
-            print("[INFO] Trying alternative method: converting PDF to images first...")
-            return extract_with_llm_images(pdf_path, api_key, extract_year)
+        print(f"\n[ERROR] Failed to extract chunk {i}: {e}")
+        return None
+    
+    # Combine all content blocks (in case there are multiple)
+    chunk_text = ""
+    for content_block in response.content:
+        if hasattr(content_block, 'text'):
+            chunk_text += content_block.text
+    
+    if response.stop_reason == "refusal" or not chunk_text.strip():
+        print(f"\n[WARNING] Chunk {i} returned no content (stop reason: {response.stop_reason})")
         return None
+    if response.stop_reason == "max_tokens":
+        print(f"\n[WARNING] Chunk {i} response was truncated due to max_tokens limit!")
+    
+    cache.set(chunk_key, chunk_text)
+    print(f"  Extracted chunk {i}...", end='\r')
+    return chunk_text
 
 
-def extract_with_llm_images(pdf_path: str, api_key: str, extract_year: bool = False) -> str:
+async def _extract_chunks_async(client, chunks: list[bytes], extraction_prompt: str) -> list:
     """
-    Alternative extraction method: Convert PDF to images and send to Claude Vision API.
-    This is a fallback if direct PDF attachment doesn't work.
+    Send all PDF chunks to Claude API concurrently.
     
     Args:
-        pdf_path: Path to PDF file
-        api_key: Anthropic API key
-        extract_year: Whether to extract exam information from previous year question papers (default: False)
+        client: Anthropic client (shared across chunks)
+        chunks: List of PDF chunk bytes in page order
+        extraction_prompt: Extraction instructions
         
     Returns:
-        Extracted text from all pages, or None if fails
+        List of chunk texts (None for failed chunks) in page order
+    """
+    sem = asyncio.Semaphore(CHUNK_CONCURRENCY)
+    cache = LLMCache()
+    return await asyncio.gather(
+        *[_extract_chunk_async(client, sem, i, chunk, extraction_prompt, cache) for i, chunk in enumerate(chunks, 1)]
+    )
+
+
+def _extract_in_chunks(client, pdf_bytes: bytes, extraction_prompt: str) -> str:
+    """
+    Extract a large PDF by sending page chunks to Claude concurrently.
+    Small PDFs are left to the single-request path.
+    
+    Args:
+        client: Anthropic client
+        pdf_bytes: PDF file content
+        extraction_prompt: Extraction instructions
+        
+    Returns:
+        Combined text of all chunks in page order, or None if the PDF is small
+        or any chunk failed (caller then uses the single-request path)
     """
-    # Try importing required libraries
     try:
-        from pdf2image import convert_from_path  # Convert PDF pages to images
-        from PIL import Image  # Image processing
-        import io  # For in-memory image buffer
-    except ImportError:
-        # Libraries not installed
-        print("[ERROR] pdf2image not installed. Install with: pip install pdf2image")
-        print("[INFO] Or use Poppler + pdf2image for this method")
+        from PyPDF2 import PdfReader
+        num_pages = len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+    except Exception:
+        # Can't count pages - use the single-request path
         return None
     
-    # Convert PDF pages to images
-    print("[INFO] Converting PDF to images...")
-    try:
-        # Convert each PDF page to a PIL Image object
-        # Specify Poppler path explicitly
-        poppler_path = r'C:\Poppler\poppler-25.12.0\Library\bin'
-        images = convert_from_path(pdf_path, poppler_path=poppler_path)
-        print(f"[OK] Converted {len(images)} pages to images")
-    except Exception as e:
-        # Conversion failed (usually Poppler not installed or wrong path)
-        print(f"[ERROR] Failed to convert PDF to images: {e}")
-        print(f"[INFO] Checked Poppler path: {poppler_path}")
-        print("[INFO] Make sure Poppler is installed and the path is correct.")
+    if num_pages <= CHUNK_PAGE_THRESHOLD:
         return None
     
-    # Initialize Claude client with longer timeout for large PDFs
-    print("[INFO] Sending pages to Claude Vision API...")
-    client = Anthropic(
-        api_key=api_key,
-        timeout=300.0  # 5 minutes timeout for large PDFs
-    )
-    all_text = []  # Store text from each page
+    chunks = split_pdf_into_chunks(pdf_bytes, PAGES_PER_CHUNK)
+    if not chunks:
+        return None
     
-    # Process each page image
-    for i, image in enumerate(images, 1):
-        # Show progress
-        print(f"  Processing page {i}/{len(images)}...", end='\r')
-        
-        # Convert PIL image to base64
-        buffer = io.BytesIO()  # Create in-memory buffer
-        image.save(buffer, format='PNG')  # Save image as PNG to buffer
-        image_bytes = buffer.getvalue()  # Get bytes from buffer
-        image_base64 = base64.b64encode(image_bytes).decode('utf-8')  # Encode to base64
+    print(f"[INFO] Large PDF ({num_pages} pages): extracting {len(chunks)} chunks of {PAGES_PER_CHUNK} pages concurrently...")
+    chunk_texts = asyncio.run(_extract_chunks_async(client, chunks, extraction_prompt))
+    print()
+    
+    if any(text is None for text in chunk_texts):
+        print("[WARNING] Some chunks failed. Falling back to a single request for the whole PDF...")
+        return None
+    
+    return "\n\n".join(chunk_texts)
+
+
+def _stream_claude_text(client, **request) -> tuple:
+    """
+    Send a request to Claude using the streaming API and collect the text.
+    Prints a live character count while the response is generated.
+    
+    Args:
+        client: Anthropic client
+        **request: Arguments for client.messages.stream (model, max_tokens, messages)
         
-        try:
+    Returns:
+        Tuple of (text: str, response: final Message with stop_reason/content)
+    """
+    chunks = []  # Text deltas as they arrive
+    received = 0  # Characters received so far
+    with client.messages.stream(**request) as stream:
+        for text in stream.text_stream:
+            chunks.append(text)
+            received += len(text)
+            print(f"  Receiving response... {received:,} characters", end='\r')
+        response = stream.get_final_message()
+    if received:
+        print()  # Finish the progress line
+    return "".join(chunks), response
+
+
+async def _extract_page_async(client, sem: asyncio.Semaphore, i: int, image, cache: LLMCache,
+                              extract_year: bool = False) -> tuple:
+    """
+    Extract text from a single page image using Claude Vision API.
+    Errors are reported per page instead of raised so one bad page doesn't sink the batch.
+    
+    Args:
+        client: Anthropic client (shared across pages)
+        sem: Semaphore bounding the number of in-flight requests
+        i: Page number (1-indexed)
+        image: PIL Image of the page
+        cache: LLMCache used to skip pages that were already extracted
+        extract_year: Whether to extract exam information from page 1 (default: False)
+    
+    Returns:
+        Tuple of (page_number: int, page_text: str)
+    """
+    # Convert PIL image to base64 (JPEG is several times smaller than PNG for scanned pages)
+    buffer = io.BytesIO()  # Create in-memory buffer
+    if image.mode != 'RGB':
+        image = image.convert('RGB')  # JPEG has no alpha channel
+    image.save(buffer, format='JPEG', quality=85, optimize=True)  # Save image as JPEG to buffer
+    image_bytes = buffer.getvalue()  # Get bytes from buffer
+    image_base64 = base64.b64encode(image_bytes).decode('utf-8')  # Encode to base64
+    
+    # Page-specific part of the prompt goes after the image so all pages share the cached instruction
+    page_suffix = f"Page {i}." + (
+        " If this page contains exam information (e.g., '[CBSE 2023 (57/1/1)]', '[CBSE Delhi 2015 [HOTS]]'), include it at the beginning in format: 'EXAM_INFO: [full exam information]'." if extract_year and i == 1 else ""
+    )
+    
+    # Return cached page text if this exact image + prompt was processed before
+    page_key = LLMCache.make_key(image_bytes, PAGE_EXTRACTION_PROMPT, page_suffix, CLAUDE_MODEL)
+    cached_text = cache.get(page_key)
+    if cached_text:
+        return i, cached_text
+    
+    try:
+        async with sem:
             # Send image to Claude Vision API
-            response = client.messages.create(
-                model="claude-sonnet-4-5-20250929",  # Claude model
+            # The blocking client call runs in a worker thread so pages overlap
+            response = await asyncio.to_thread(
+                _call_claude,
+                client.messages.create,
+                model=CLAUDE_MODEL,  # Claude model
                 max_tokens=4000,  # Max tokens per page
                 messages=[{
                     "role": "user",
                     "content": [
                         {
                             "type": "text",
-                            "text": f"Extract all text content from this page (page {i}). Include questions, options, tables, and any other text. Maintain formatting where possible." + (
-                                " If this is page 1 and contains exam information (e.g., '[CBSE 2023 (57/1/1)]', '[CBSE Delhi 2015 [HOTS]]'), include it at the beginning in format: 'EXAM_INFO: [full exam information]'." if extract_year and i == 1 else ""
-                            )
+                            "text": PAGE_EXTRACTION_PROMPT,
+                            "cache_control": {"type": "ephemeral"}  # Same instruction for every page
                         },
                         {
                             "type": "image",  # Image attachment
                             "source": {
                                 "type": "base64",
-                                "media_type": "image/png",  # PNG format
+                                "media_type": "image/jpeg",  # JPEG format
                                 "data": image_base64  # Base64 image data
                             }
+                        },
+                        {
+                            "type": "text",
+                            "text": page_suffix  # Small uncached page-specific note
                         }
                     ]
                 }]
             )
+    except Exception as e:
+        # Error processing this page - keep going with the other pages
+        print(f"\n[ERROR] Failed to process page {i}: {e}")
+        return i, "[ERROR: Could not extract]"
+    
+    # Combine all content blocks (in case there are multiple)
+    page_text = ""
+    for content_block in response.content:
+        if hasattr(content_block, 'text'):
+            page_text += content_block.text
+    
+    # Check if response was truncated
+    if hasattr(response, 'stop_reason') and response.stop_reason == "max_tokens":
+        print(f"\n[WARNING] Page {i} response was truncated due to max_tokens limit!")
+    
+    if page_text:
+        cache.set(page_key, page_text)
+    print(f"  Processed page {i}...", end='\r')
+    return i, page_text
+
+
+async def _extract_pages_async(client, images: list, extract_year: bool = False) -> list:
+    """
+    Send all page images to Claude Vision API concurrently.
+    
+    Args:
+        client: Anthropic client (shared across pages so its connection pool is reused)
+        images: List of PIL Images, one per page
+        extract_year: Whether to extract exam information from page 1 (default: False)
+    
+    Returns:
+        List of (page_number, page_text) tuples in page order
+    """
+    sem = asyncio.Semaphore(PAGE_CONCURRENCY)
+    cache = LLMCache()  # Per-page responses are cached by image hash
+    
+    results = await asyncio.gather(
+        *[_extract_page_async(client, sem, i, image, cache, extract_year) for i, image in enumerate(images, 1)],
+        return_exceptions=True
+    )
+    
+    # Replace any unexpected exception with an error marker for that page
+    return [
+        (i, "[ERROR: Could not extract]") if isinstance(result, BaseException) else result
+        for i, result in enumerate(results, 1)
+    ]
+
+
+class PDFExtractor:
+    """
+    Extracts PDF text with Claude, reusing one API client for every request.
+    
+    The direct PDF request, the chunked path and the image fallback all go through
+    the same client, so its connection pool (and TLS sessions) are reused.
+    """
+    
+    def __init__(self, api_key: str):
+        """
+        Initialize the extractor.
+        
+        Args:
+            api_key: Anthropic API key for authentication
+        """
+        self.api_key = api_key
+        # 5 minutes timeout for large PDFs; retries are handled by _call_claude
+        self.client = Anthropic(api_key=api_key, timeout=300.0, max_retries=0)
+    
+    def _stream_pdf_extraction(self, pdf_path: str, pdf_bytes: bytes, extraction_prompt: str) -> tuple:
+        """
+        Send the whole PDF to Claude in one streaming request.
+        Large PDFs are uploaded once and every retry references the upload; small ones go inline.
+        
+        Args:
+            pdf_path: Path to PDF file (used for the upload name)
+            pdf_bytes: PDF file content
+            extraction_prompt: Extraction instructions
+            
+        Returns:
+            Tuple of (text: str, response: final Message with stop_reason/content)
+        """
+        file_id = _upload_pdf(self.client, Path(pdf_path).name, pdf_bytes)
+        messages_client, document, extra_args = _pdf_request_parts(self.client, pdf_bytes, file_id)
+        try:
+            # We send both a text prompt and the PDF document
+            return _call_claude(
+                _stream_claude_text,
+                messages_client,
+                model=CLAUDE_MODEL,  # Claude model version
+                max_tokens=16000,  # Maximum response length
+                messages=[{
+                    "role": "user",  # User message
+                    "content": [
+                        {
+                            "type": "text",  # Text instruction (static, placed first so it is cache-eligible)
+                            "text": extraction_prompt,
+                            "cache_control": {"type": "ephemeral"}  # Reuse the instruction prefix across requests
+                        },
+                        document  # PDF document attachment
+                    ]
+                }],
+                **extra_args
+            )
+        finally:
+            _delete_upload(self.client, file_id)
+    
+    def extract_with_llm(self, pdf_path: str, extract_year: bool = False, pdf_bytes: bytes = None) -> str:
+        """
+        Extract text content from PDF using Claude API.
+        This is the main extraction function that sends PDF to Claude and gets text back.
+        
+        Args:
+            pdf_path: Path to PDF file (only used as the file name when pdf_bytes is given)
+            extract_year: Whether to extract exam information from previous year question papers (default: False)
+            pdf_bytes: PDF content already in memory (e.g. an upload); read from pdf_path if None
             
-            # Combine all content blocks (in case there are multiple)
-            page_text = ""
-            for content_block in response.content:
-                if hasattr(content_block, 'text'):
-                    page_text += content_block.text
+        Returns:
+            Extracted text content as string, or None if extraction fails
+        """
+        # Load PDF bytes (unless the caller already has them)
+        if pdf_bytes is None:
+            print("[INFO] Loading PDF file...")
+            pdf_bytes = load_pdf_bytes(pdf_path)
+        
+        # Check if PDF was loaded successfully
+        if not pdf_bytes:
+            return None
+        
+        # Inform user that we're sending to API (progress is shown as the response streams in)
+        print("[INFO] Sending PDF to Claude API for extraction...")
+        
+        try:
+            # Build extraction prompt
+            extraction_prompt = """Extract all text content from this PDF. 
+
+Please extract:
+1. All questions (ignore question numbers in PDF, just extract the question text)
+2. All options (if multiple choice)
+3. Any tables or diagrams mentioned
+4. Answers if provided"""
             
-            # Check if response was truncated
-            if hasattr(response, 'stop_reason') and response.stop_reason == "max_tokens":
-                print(f"\n[WARNING] Page {i} response was truncated due to max_tokens limit!")
+            # Add year extraction instruction if enabled
+            if extract_year:
+                extraction_prompt += """
+5. Exam information: If this is a previous year question paper, extract the full exam information (e.g., "[CBSE 2023 (57/1/1)]", "[CBSE Delhi 2015 [HOTS]]", "[CBSE Sample Question Paper 2024]"). Include this at the beginning of the extracted content in the format: "EXAM_INFO: [full exam information]" if found."""
             
-            # Store page text with page number marker
-            all_text.append(f"\n--- PAGE {i} ---\n{page_text}\n")
+            extraction_prompt += """
+
+Return the extracted content in a clear, structured format. Maintain the order of questions as they appear in the PDF.
+
+Extract all content accurately and completely."""
+            
+            # Return cached extraction if this exact PDF + prompt was processed before
+            cache = LLMCache()
+            cache_key = LLMCache.make_key(pdf_bytes, extraction_prompt, CLAUDE_MODEL)
+            cached_text = cache.get(cache_key)
+            if cached_text:
+                print(f"[OK] Using cached extraction: {len(cached_text):,} characters")
+                return cached_text
+            
+            # Large PDFs: extract page chunks concurrently so no single response hits max_tokens
+            chunked_text = _extract_in_chunks(self.client, pdf_bytes, extraction_prompt)
+            if chunked_text:
+                print(f"[OK] Content extracted successfully: {len(chunked_text):,} characters")
+                cache.set(cache_key, chunked_text)
+                return chunked_text
+            
+            # Send the whole PDF in a single streaming request
+            extracted_text, response = self._stream_pdf_extraction(pdf_path, pdf_bytes, extraction_prompt)
+            
+            # Check stop reason first - handle refusal specifically
+            if hasattr(response, 'stop_reason'):
+                if response.stop_reason == "refusal":
+                    print("[WARNING] Claude API refused to process the PDF document attachment.")
+                    print("[INFO] This may be due to PDF format or content policy restrictions.")
+                    print("[INFO] Automatically trying alternative method: converting PDF to images...")
+                    # Try image-based extraction as fallback
+                    return self.extract_with_llm_images(pdf_path, pdf_bytes=pdf_bytes)
+                elif response.stop_reason == "max_tokens":
+                    print("[WARNING] Response was truncated due to max_tokens limit!")
+                    print("[WARNING] Some content may be missing. Consider increasing max_tokens or splitting the PDF.")
+                elif response.stop_reason:
+                    print(f"[INFO] Response stop reason: {response.stop_reason}")
+            
+            # Validate we got content
+            if not extracted_text or len(extracted_text.strip()) < 100:
+                print("[ERROR] Extracted text is too short or empty. Response may have failed.")
+                print(f"[DEBUG] Response content blocks: {len(response.content)}")
+                if hasattr(response, 'stop_reason'):
+                    print(f"[DEBUG] Stop reason: {response.stop_reason}")
+                    if response.stop_reason == "refusal":
+                        print("[INFO] Trying alternative method: converting PDF to images...")
+                        return self.extract_with_llm_images(pdf_path, extract_year, pdf_bytes)
+                # Show actual response content for debugging
+                if extracted_text:
+                    print(f"[DEBUG] Response content preview: {extracted_text[:200]}")
+                return None
+            
+            print(f"[OK] Content extracted successfully: {len(extracted_text):,} characters")
+            cache.set(cache_key, extracted_text)
+            return extracted_text
+            
+        except Exception as e:
+            # Handle API errors
+            print(f"[ERROR] LLM extraction failed: {e}")
+            if "api_key" in str(e).lower() or "authentication" in str(e).lower():
+                # API key issue
+                print("\n[ERROR] API key issue. Please check your API key in config.")
+            elif "file" in str(e).lower() or "attachment" in str(e).lower():
+                # PDF attachment format issue - try alternative method
+                print("\n[INFO] Claude API may not support direct PDF attachments in this format.")
+                print("[INFO] Trying alternative method: converting PDF to images first...")
+                return self.extract_with_llm_images(pdf_path, extract_year, pdf_bytes)
+            return None
+
+    def extract_with_llm_images(self, pdf_path: str, extract_year: bool = False, pdf_bytes: bytes = None) -> str:
+        """
+        Alternative extraction method: Convert PDF to images and send to Claude Vision API.
+        This is a fallback if direct PDF attachment doesn't work.
+        
+        Args:
+            pdf_path: Path to PDF file
+            extract_year: Whether to extract exam information from previous year question papers (default: False)
+            pdf_bytes: PDF content already in memory; converted instead of pdf_path if given
             
+        Returns:
+            Extracted text from all pages, or None if fails
+        """
+        # Try importing required libraries
+        try:
+            from pdf2image import convert_from_path, convert_from_bytes  # Convert PDF pages to images
+            from PIL import Image  # Image processing
+        except ImportError:
+            # Libraries not installed
+            print("[ERROR] pdf2image not installed. Install with: pip install pdf2image")
+            print("[INFO] Or use Poppler + pdf2image for this method")
+            return None
+        
+        # Convert PDF pages to images
+        print("[INFO] Converting PDF to images...")
+        try:
+            # Convert each PDF page to a PIL Image object
+            # Specify Poppler path explicitly
+            poppler_path = r'C:\Poppler\poppler-25.12.0\Library\bin'
+            # 150 DPI keeps pages under Claude's image size limit (higher DPI costs the same tokens),
+            # and thread_count lets Poppler rasterize pages in parallel
+            images = (convert_from_bytes if pdf_bytes is not None else convert_from_path)(
+                pdf_bytes if pdf_bytes is not None else pdf_path,
+                dpi=PAGE_IMAGE_DPI,
+                fmt='jpeg',
+                thread_count=os.cpu_count() or 1,
+                poppler_path=poppler_path
+            )
+            print(f"[OK] Converted {len(images)} pages to images")
         except Exception as e:
-            # Error processing this page
-            print(f"\n[ERROR] Failed to process page {i}: {e}")
-            all_text.append(f"\n--- PAGE {i} ---\n[ERROR: Could not extract]\n")
+            # Conversion failed (usually Poppler not installed or wrong path)
+            print(f"[ERROR] Failed to convert PDF to images: {e}")
+            print(f"[INFO] Checked Poppler path: {poppler_path}")
+            print("[INFO] Make sure Poppler is installed and the path is correct.")
+            return None
+        
+        # Send pages concurrently; requests are bounded by PAGE_CONCURRENCY
+        print("[INFO] Sending pages to Claude Vision API...")
+        page_results = asyncio.run(_extract_pages_async(self.client, images, extract_year))
+        
+        # Combine all page texts in page order
+        all_text = [f"\n--- PAGE {i} ---\n{page_text}\n" for i, page_text in page_results]
+        print(f"\n[OK] Extracted text from {len(images)} pages")
+        return "\n".join(all_text)
+
+    def extract_with_llm_no_fallback(self, pdf_path: str, extract_year: bool = False) -> str:
+        """
+        Extract text content from PDF using Claude API (without image fallback).
+        This is the same as extract_with_llm() but returns None on error instead of
+        calling the image OCR fallback.
+        
+        Args:
+            pdf_path: Path to PDF file
+            extract_year: Whether to extract exam information from previous year question papers (default: False)
+            
+        Returns:
+            Extracted text content as string, or None if extraction fails
+        """
+        # Load PDF bytes
+        print("[INFO] Loading PDF file...")
+        pdf_bytes = load_pdf_bytes(pdf_path)
+        
+        # Check if PDF was loaded successfully
+        if not pdf_bytes:
+            return None
+        
+        # Inform user that we're sending to API (progress is shown as the response streams in)
+        print("[INFO] Sending PDF to Claude API for extraction...")
+        
+        try:
+            # Build extraction prompt
+            extraction_prompt = """Extract all text content from this PDF. 
+
+Please extract:
+1. All questions (ignore question numbers in PDF, just extract the question text)
+2. All options (if multiple choice)
+3. Any tables or diagrams mentioned
+4. Answers if provided"""
+            
+            # Add year extraction instruction if enabled
+            if extract_year:
+                extraction_prompt += """
+5. Exam information: If this is a previous year question paper, extract the full exam information (e.g., "[CBSE 2023 (57/1/1)]", "[CBSE Delhi 2015 [HOTS]]", "[CBSE Sample Question Paper 2024]"). Include this at the beginning of the extracted content in the format: "EXAM_INFO: [full exam information]" if found."""
+            
+            extraction_prompt += """
+
+Return the extracted content in a clear, structured format. Maintain the order of questions as they appear in the PDF.
+
+Extract all content accurately and completely."""
+            
+            # Return cached extraction if this exact PDF + prompt was processed before
+            cache = LLMCache()
+            cache_key = LLMCache.make_key(pdf_bytes, extraction_prompt, CLAUDE_MODEL)
+            cached_text = cache.get(cache_key)
+            if cached_text:
+                print(f"[OK] Using cached extraction: {len(cached_text):,} characters")
+                return cached_text
+            
+            # Large PDFs: extract page chunks concurrently so no single response hits max_tokens
+            chunked_text = _extract_in_chunks(self.client, pdf_bytes, extraction_prompt)
+            if chunked_text:
+                print(f"[OK] Content extracted successfully: {len(chunked_text):,} characters")
+                cache.set(cache_key, chunked_text)
+                return chunked_text
+            
+            # Send the whole PDF in a single streaming request
+            extracted_text, response = self._stream_pdf_extraction(pdf_path, pdf_bytes, extraction_prompt)
+            
+            # Check stop reason first - handle refusal specifically
+            if hasattr(response, 'stop_reason'):
+                if response.stop_reason == "refusal":
+                    print("[WARNING] Claude API refused to process the PDF document attachment.")
+                    print("[INFO] This may be due to PDF format or content policy restrictions.")
+                    print("[ERROR] Cannot use image fallback in no-fallback mode. Please use extract_with_llm() instead.")
+                    return None
+                elif response.stop_reason == "max_tokens":
+                    print("[WARNING] Response was truncated due to max_tokens limit!")
+                    print("[WARNING] Some content may be missing. Consider increasing max_tokens or splitting the PDF.")
+                elif response.stop_reason:
+                    print(f"[INFO] Response stop reason: {response.stop_reason}")
+            
+            # Validate we got content
+            if not extracted_text or len(extracted_text.strip()) < 100:
+                print("[ERROR] Extracted text is too short or empty. Response may have failed.")
+                print(f"[DEBUG] Response content blocks: {len(response.content)}")
+                if hasattr(response, 'stop_reason'):
+                    print(f"[DEBUG] Stop reason: {response.stop_reason}")
+                # Show actual response content for debugging
+                if extracted_text:
+                    print(f"[DEBUG] Response content preview: {extracted_text[:200]}")
+                return None
+            
+            print(f"[OK] Content extracted successfully: {len(extracted_text):,} characters")
+            cache.set(cache_key, extracted_text)
+            return extracted_text
+            
+        except Exception as e:
+            # Handle API errors (no fallback to image extraction)
+            print(f"[ERROR] LLM extraction failed: {e}")
+            if "api_key" in str(e).lower() or "authentication" in str(e).lower():
+                # API key issue
+                print("\n[ERROR] API key issue. Please check your API key in config.")
+            return None
+
+
+@lru_cache(maxsize=None)
+def get_pdf_extractor(api_key: str) -> PDFExtractor:
+    """
+    Get the shared PDFExtractor for an API key (one client per process, reused across PDFs).
     
-    # Combine all page texts
-    print(f"\n[OK] Extracted text from {len(images)} pages")
-    return "\n".join(all_text)
+    Args:
+        api_key: Anthropic API key
+        
+    Returns:
+        PDFExtractor instance
+    """
+    return PDFExtractor(api_key)
+
+
+def extract_with_llm(pdf_path: str, api_key: str, extract_year: bool = False) -> str:
+    """
+    Extract text content from PDF using Claude API (falls back to images on refusal).
+    See PDFExtractor.extract_with_llm.
+    
+    Args:
+        pdf_path: Path to PDF file
+        api_key: Anthropic API key for authentication
+        extract_year: Whether to extract exam information from previous year question papers (default: False)
+        
+    Returns:
+        Extracted text content as string, or None if extraction fails
+    """
+    return get_pdf_extractor(api_key).extract_with_llm(pdf_path, extract_year)
+
+
+def extract_with_llm_bytes(pdf_bytes: bytes, pdf_name: str, api_key: str, extract_year: bool = False) -> str:
+    """
+    Extract text content from a PDF that is already in memory (e.g. an upload),
+    without writing it to disk first. See PDFExtractor.extract_with_llm.
+    
+    Args:
+        pdf_bytes: PDF file content
+        pdf_name: File name of the PDF (the file itself is not read)
+        api_key: Anthropic API key for authentication
+        extract_year: Whether to extract exam information from previous year question papers (default: False)
+        
+    Returns:
+        Extracted text content as string, or None if extraction fails
+    """
+    return get_pdf_extractor(api_key).extract_with_llm(pdf_name, extract_year, pdf_bytes)
+
+
+def extract_with_llm_images(pdf_path: str, api_key: str, extract_year: bool = False) -> str:
+    """
+    Extract text by converting PDF pages to images for Claude Vision API.
+    See PDFExtractor.extract_with_llm_images.
+    
+    Args:
+        pdf_path: Path to PDF file
+        api_key: Anthropic API key
+        extract_year: Whether to extract exam information from previous year question papers (default: False)
+        
+    Returns:
+        Extracted text from all pages, or None if fails
+    """
+    return get_pdf_extractor(api_key).extract_with_llm_images(pdf_path, extract_year)
+
+
+def extract_with_llm_no_fallback(pdf_path: str, api_key: str, extract_year: bool = False) -> str:
+    """
+    Extract text content from PDF using Claude API (without image fallback).
+    See PDFExtractor.extract_with_llm_no_fallback.
+    
+    Args:
+        pdf_path: Path to PDF file
+        api_key: Anthropic API key for authentication
+        extract_year: Whether to extract exam information from previous year question papers (default: False)
+        
+    Returns:
+        Extracted text content as string, or None if extraction fails
+    """
+    return get_pdf_extractor(api_key).extract_with_llm_no_fallback(pdf_path, extract_year)
 
 
 def get_api_key() -> str:
     """
     Get API key from Streamlit secrets, config file, or environment variable.
-    Tries multiple sources in order of preference.
+    A found key is cached, so config.yaml is only parsed once per process; if no key
+    was found, the next call looks again (e.g. after secrets are configured).
+    
+    Returns:
+        API key string, or empty string if not found
+    """
+    global _api_key
+    if not _api_key:
+        _api_key = _lookup_api_key()
+    return _api_key
+
+
+def _lookup_api_key() -> str:
+    """
+    Look up the API key, trying multiple sources in order of preference.
     
     Returns:
         API key string, or empty string if not found
     """
     # Try Streamlit secrets first (for Streamlit Cloud deployment)
     try:
-        import streamlit as st
-        if hasattr(st, 'secrets') and 'anthropic' in st.secrets:
+        if st is not None and hasattr(st, 'secrets') and 'anthropic' in st.secrets:
             api_key = st.secrets['anthropic']['api_key']
             if api_key:
                 return api_key
@@ -292,9 +1111,8 @@ def get_api_key() -> str:
     
     # Try config file
     try:
-        import yaml  # YAML parser for config file
         config_path = Path("config.yaml")  # Config file path
-        if config_path.exists():  # Check if config file exists
+        if yaml is not None and config_path.exists():  # Check if config file exists
             with open(config_path, 'r') as f:
                 config = yaml.safe_load(f)  # Load YAML config
                 # Get API key from nested structure: llm -> api_key
@@ -304,7 +1122,6 @@ def get_api_key() -> str:
         pass
     
     # Try environment variable as fallback
-    import os
     return os.getenv('ANTHROPIC_API_KEY', '')  # Get from environment or return empty
 
 
@@ -319,14 +1136,16 @@ def analyze_content(text: str):
     Returns:
         Tuple of (issues list, good_signs list)
     """
-    text_lower = text.lower()  # Convert to lowercase for case-insensitive search
-    
     issues = []  # List to store problems found
     good_signs = []  # List to store positive indicators
     
+    # Scan once for all indicator substrings instead of one full scan per check
+    # (patterns are case-insensitive, so no lowercase copy of the whole text is needed)
+    hits = {hit.lower() for hit in _INDICATOR_RE.findall(text)}
+    
     # Check for question indicators (Q1, Q2, question, ?, answer, option)
     question_indicators = ['q1', 'q2', 'question', '?', 'ans.', 'answer', 'option']
-    found_questions = [ind for ind in question_indicators if ind in text_lower]
+    found_questions = [ind for ind in question_indicators if ind in hits]
     if found_questions:
         # Found question indicators - good sign
         good_signs.append(f"Found question indicators: {', '.join(found_questions[:3])}")
@@ -334,20 +1153,18 @@ def analyze_content(text: str):
         # No question indicators found - potential issue
         issues.append("No question indicators found")
     
-    # Count questions using regex pattern
-    import re
-    # Pattern matches: Q1, Q2, Question 1, etc. at start of line
-    question_count = len(re.findall(r'(?:^|\n)\s*(?:q\d+|question\s+\d+)', text_lower, re.MULTILINE))
+    # Count questions using regex pattern (Q1, Q2, Question 1, etc. at start of line)
+    question_count = len(_QUESTION_START_RE.findall(text))
     if question_count > 0:
         # Found questions - good sign
         good_signs.append(f"Found approximately {question_count} questions")
     
     # Check for answer sections
-    if 'answer' in text_lower or 'ans.' in text_lower:
+    if 'answer' in hits or 'ans.' in hits:
         good_signs.append("Found answer sections")
     
     # Check for multiple choice options (a), b), etc.)
-    if 'option' in text_lower or 'a)' in text_lower or 'b)' in text_lower:
+    if 'option' in hits or 'a)' in hits or 'b)' in hits:
         good_signs.append("Found multiple choice options")
     
     # Check text quality - length check
@@ -380,136 +1197,52 @@ def save_extracted_text(text: str, output_file: str):
     # Write text to file with header
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write("=" * 60 + "\n")  # Header separator
-        f.write("EXTRACTED PDF CONTENT (via LLM)\n")  # Header text
+        f.write(EXTRACTED_CONTENT_TITLE + "\n")  # Header text
         f.write("=" * 60 + "\n\n")  # Header separator
         f.write(text)  # Write extracted content
     
     print(f"[OK] Extracted text saved to: {output_file}")
 
 
-def extract_with_llm_no_fallback(pdf_path: str, api_key: str, extract_year: bool = False) -> str:
+async def _extract_pdf_async(sem: asyncio.Semaphore, pdf_path: str, api_key: str, extract_year: bool = False) -> str:
     """
-    Extract text content from PDF using Claude API (without image fallback).
-    This is the same as extract_with_llm() but returns None on error instead of
-    calling the image OCR fallback.
+    Extract one PDF of a multi-PDF batch.
     
     Args:
+        sem: Semaphore bounding the number of PDFs in flight
         pdf_path: Path to PDF file
         api_key: Anthropic API key for authentication
-        extract_year: Whether to extract exam information from previous year question papers (default: False)
+        extract_year: Whether to extract exam information (default: False)
         
     Returns:
-        Extracted text content as string, or None if extraction fails
+        Extracted text content, or None if extraction fails
     """
-    # Load PDF and convert to base64 for API
-    print("[INFO] Loading PDF file...")
-    pdf_base64 = load_pdf_as_base64(pdf_path)
-    
-    # Check if PDF was loaded successfully
-    if not pdf_base64:
-        return None
-    
-    # Inform user that we're sending to API (may take time)
-    print("[INFO] Sending PDF to Claude API for extraction...")
-    print("[INFO] This may take 30-60 seconds...")
-    
-    try:
-        # Initialize Anthropic client with API key
-        client = Anthropic(api_key=api_key)
-        
-        # Read PDF as binary (needed for document attachment)
-        with open(pdf_path, 'rb') as f:
-            pdf_bytes = f.read()
-        
-        # Build extraction prompt
-        extraction_prompt = """Extract all text content from this PDF. 
-
-Please extract:
-1. All questions (ignore question numbers in PDF, just extract the question text)
-2. All options (if multiple choice)
-3. Any tables or diagrams mentioned
-4. Answers if provided"""
-        
-        # Add year extraction instruction if enabled
-        if extract_year:
-            extraction_prompt += """
-5. Exam information: If this is a previous year question paper, extract the full exam information (e.g., "[CBSE 2023 (57/1/1)]", "[CBSE Delhi 2015 [HOTS]]", "[CBSE Sample Question Paper 2024]"). Include this at the beginning of the extracted content in the format: "EXAM_INFO: [full exam information]" if found."""
-        
-        extraction_prompt += """
+    async with sem:
+        # The blocking extraction runs in a worker thread so PDFs overlap
+        return await asyncio.to_thread(extract_with_llm_no_fallback, pdf_path, api_key, extract_year)
 
-Return the extracted content in a clear, structured format. Maintain the order of questions as they appear in the PDF.
 
-Extract all content accurately and completely."""
-        
-        # Create API request to Claude
-        # We send both a text prompt and the PDF document
-        response = client.messages.create(
-            model="claude-sonnet-4-5-20250929",  # Claude model version
-            max_tokens=16000,  # Maximum response length
-            messages=[{
-                "role": "user",  # User message
-                "content": [
-                    {
-                        "type": "text",  # Text instruction
-                        "text": extraction_prompt
-                    },
-                    {
-                        "type": "document",  # PDF document attachment
-                        "source": {
-                            "type": "base64",  # Base64 encoding
-                            "media_type": "application/pdf",  # PDF MIME type
-                            "data": pdf_base64  # Base64-encoded PDF data
-                        }
-                    }
-                ]
-            }]
-        )
-        
-        # Combine all content blocks (in case there are multiple)
-        extracted_text = ""
-        for content_block in response.content:
-            if hasattr(content_block, 'text'):
-                extracted_text += content_block.text
-        
-        # Check stop reason first - handle refusal specifically
-        if hasattr(response, 'stop_reason'):
-            if response.stop_reason == "refusal":
-                print("[WARNING] Claude API refused to process the PDF document attachment.")
-                print("[INFO] This may be due to PDF format or content policy restrictions.")
-                print("[ERROR] Cannot use image fallback in no-fallback mode. Please use extract_with_llm() instead.")
-                return None
-            elif response.stop_reason == "max_tokens":
-                print("[WARNING] Response was truncated due to max_tokens limit!")
-                print("[WARNING] Some content may be missing. Consider increasing max_tokens or splitting the PDF.")
-            elif response.stop_reason:
-                print(f"[INFO] Response stop reason: {response.stop_reason}")
-        
-        # Validate we got content
-        if not extracted_text or len(extracted_text.strip()) < 100:
-            print("[ERROR] Extracted text is too short or empty. Response may have failed.")
-            print(f"[DEBUG] Response content blocks: {len(response.content)}")
-            if hasattr(response, 'stop_reason'):
-                print(f"[DEBUG] Stop reason: {response.stop_reason}")
-            # Show actual response content for debugging
-            if extracted_text:
-                print(f"[DEBUG] Response content preview: {extracted_text[:200]}")
-            return None
-        
-        print(f"[OK] Content extracted successfully: {len(extracted_text):,} characters")
-        return extracted_text
+async def _extract_pdfs_async(pdf_paths: list[str], api_key: str, extract_year: bool = False) -> list:
+    """
+    Extract several PDFs concurrently.
+    
+    Args:
+        pdf_paths: List of paths to PDF files
+        api_key: Anthropic API key for authentication
+        extract_year: Whether to extract exam information (default: False)
         
-    except Exception as e:
-        # Handle API errors (no fallback to image extraction)
-        print(f"[ERROR] LLM extraction failed: {e}")
-        if "api_key" in str(e).lower() or "authentication" in str(e).lower():
-            # API key issue
-            print("\n[ERROR] API key issue. Please check your API key in config.")
-        return None
+    Returns:
+        List of extracted texts (None for failed PDFs) in input order
+    """
+    sem = asyncio.Semaphore(PDF_CONCURRENCY)
+    return await asyncio.gather(
+        *[_extract_pdf_async(sem, pdf_path, api_key, extract_year) for pdf_path in pdf_paths]
+    )
 
 
 def extract_multiple_pdfs(pdf_paths: list[str], api_key: str, extract_year: bool = False) -> tuple[str, list[tuple[str, str]]]:
     """
-    Extract text content from multiple PDFs sequentially.
+    Extract text content from multiple PDFs concurrently (results keep the input order).
     
     Args:
         pdf_paths: List of paths to PDF files
@@ -523,22 +1256,20 @@ def extract_multiple_pdfs(pdf_paths: list[str], api_key: str, extract_year: bool
     pdf_contents = []  # List of (pdf_name, extracted_text) tuples
     combined_parts = []  # List of text parts to combine
     
-    print(f"[INFO] Processing {len(pdf_paths)} PDF(s) sequentially...")
-    print()
-    
-    for i, pdf_path in enumerate(pdf_paths, 1):
-        pdf_path_obj = Path(pdf_path)
-        pdf_name = pdf_path_obj.stem
-        
-        print(f"[INFO] Processing PDF {i}/{len(pdf_paths)}: {pdf_name}")
-        
-        # Check if PDF exists
-        if not pdf_path_obj.exists():
+    # Check that every PDF exists before sending any of them
+    for pdf_path in pdf_paths:
+        if not Path(pdf_path).exists():
             print(f"[ERROR] PDF file not found: {pdf_path}")
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-        
-        # Extract text using LLM (no fallback)
-        extracted_text = extract_with_llm_no_fallback(pdf_path, api_key, extract_year)
+    
+    print(f"[INFO] Processing {len(pdf_paths)} PDF(s), up to {PDF_CONCURRENCY} at a time...")
+    print()
+    
+    # Extract text using LLM (no fallback)
+    extracted_texts = asyncio.run(_extract_pdfs_async(pdf_paths, api_key, extract_year))
+    
+    for pdf_path, extracted_text in zip(pdf_paths, extracted_texts):
+        pdf_name = Path(pdf_path).stem
         
         if not extracted_text:
             print(f"[ERROR] Failed to extract content from PDF: {pdf_path}")
@@ -551,7 +1282,6 @@ def extract_multiple_pdfs(pdf_paths: list[str], api_key: str, extract_year: bool
         combined_parts.append(f"\n\n=== PDF: {pdf_name} ===\n\n{extracted_text}")
         
         print(f"[OK] Extracted {len(extracted_text):,} characters from {pdf_name}")
-        print()
     
     # Combine all texts
     combined_text = "\n".join(combined_parts)
@@ -8,18 +8,193 @@ This step:
 3. Creates slide-ready objects with proper organization
 4. Handles multi-part questions, passage-based questions, tables, and diagrams
 """
-from anthropic import Anthropic  # Import Anthropic SDK for Claude API
+# anthropic, yaml and Step 1 are imported where they are used, so the script
+# can report missing input files without paying their import time
 from pathlib import Path  # For file path operations
 import json  # For JSON parsing and saving
 import sys  # For system operations
-import yaml  # For reading config file
 import re  # For regular expressions (exam info extraction)
+import asyncio  # For concurrent chunk parsing requests
+from functools import lru_cache  # For sharing one client per API key
+try:
+    import orjson  # Faster JSON encoding/decoding when available
+except ImportError:
+    orjson = None
+
+
+# Claude model used for parsing (also part of the cache key)
+CLAUDE_MODEL = "claude-sonnet-4-5-20250929"
+
+# Bump whenever the parsing prompt or response handling changes, to invalidate cached parses
+PROMPT_VERSION = "2"
+
+# Content longer than this is split at question boundaries and parsed in concurrent requests
+PARSE_CHUNK_CHARS = 20000
+PARSE_CONCURRENCY = 5  # Parsing requests in flight at once
+PARSE_MAX_TOKENS = 16000  # Output budget per request (upper bound)
+PARSE_MIN_TOKENS = 2000  # Output budget floor for short content
+CHARS_PER_OUTPUT_TOKEN = 2.5  # Structured output runs a little longer than the content it parses
+PARSE_TOKEN_HEADROOM = 1.5  # Margin for per-question JSON/tool-call overhead on dense content
+PARSE_TOKEN_OVERHEAD = 1000  # Fixed allowance for the tool call wrapper
+
+# Chunk boundaries: start of a question line (Q1, Q.2, Question 3), or a blank line as fallback
+_QUESTION_BOUNDARY_RE = re.compile(r'^[ \t]*(?:q\.?\s*\d+|question\s+\d+)', re.MULTILINE | re.IGNORECASE)
+_PARAGRAPH_BREAK_RE = re.compile(r'\n[ \t]*\n')
+
+# Tool Claude is forced to call with the parsed questions, so the response is already structured
+# (tool input must be an object, so the question array is wrapped in "questions")
+EMIT_QUESTIONS_TOOL = {
+    "name": "emit_questions",
+    "description": "Return every parsed question, in the order they appear in the PDF.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "questions": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "question_number": {"type": "string"},
+                        "question_type": {
+                            "type": "string",
+                            "enum": ["regular", "multi_part", "multiple_choice", "passage_based"]
+                        },
+                        "exam_info": {"type": "string"},
+                        "slides": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "slide_type": {"type": "string", "enum": ["question", "answer", "passage"]},
+                                    "content": {
+                                        "type": "object",
+                                        "properties": {
+                                            "question_text": {"type": "string"},
+                                            "options": {"type": "array", "items": {"type": "string"}},
+                                            "table": {
+                                                "type": ["object", "null"],
+                                                "properties": {
+                                                    "headers": {"type": "array", "items": {"type": "string"}},
+                                                    "rows": {
+                                                        "type": "array",
+                                                        "items": {"type": "array", "items": {"type": "string"}}
+                                                    }
+                                                }
+                                            },
+                                            "diagram_description": {"type": ["string", "null"]},
+                                            "passage": {"type": ["string", "null"]},
+                                            "answer_text": {"type": "string"}
+                                        }
+                                    }
+                                },
+                                "required": ["slide_type", "content"]
+                            }
+                        }
+                    },
+                    "required": ["question_number", "question_type", "slides"]
+                }
+            }
+        },
+        "required": ["questions"]
+    }
+}
+
+# Parsing prompt for parse_questions_with_llm, built once; the content chunk is appended per request
+_PROMPT_INTRO = "Parse the following extracted PDF content and structure it for PowerPoint slides."
+_PROMPT_RULE_LIST = """Rules:
+1. Ignore question numbers from PDF - number sequentially as Q1, Q2, Q3... based on order they appear
+2. Maintain the exact order as questions appear in PDF
+3. For each question, create slide objects:
+   - Question slide: Contains question text (all parts if multi-part), options (if any), structured table data (if any), diagram description in brackets [description] (if any)
+   - Answer slide: Contains answer (if provided) - comes AFTER question slide
+4. Passage-based questions: 
+   - Passage gets its own slide BEFORE questions
+   - Then question slide(s) follow
+   - Then answer slide(s) follow
+5. Multi-part questions: Keep all parts (i), (ii), etc. together on same question slide
+6. Tables: Parse into structured format with "headers" array and "rows" array (each row is an array)
+7. Diagrams: Extract description and wrap in brackets [description] for manual addition later
+8. Multiple choice options: Keep as array of strings like ["a) option1", "b) option2", ...]"""
+_PROMPT_RULES = _PROMPT_INTRO + "\n\n" + _PROMPT_RULE_LIST
+_PROMPT_EXAM_INFO_RULE = """
+9. Exam information: If exam info "{exam_info}" was found in the content, include it in the "exam_info" field for all questions."""
+_PROMPT_FOOTER = """
+
+Return the questions by calling the emit_questions tool.
+
+Extracted Content:
+"""
+_PROMPT_HEADER = _PROMPT_RULES + _PROMPT_FOOTER  # Prompt without exam info (the common case)
+
+# Combined Step 1 + Step 2 request: Claude reads the PDF and returns both the text and the questions
+COMBINED_MAX_TOKENS = 32000  # Output budget for text + questions in one response
+COMBINED_MAX_PAGES = 8  # Larger PDFs rarely fit text + questions in that budget, so they use two steps
+EXTRACT_AND_EMIT_TOOL = {
+    "name": "emit_extraction",
+    "description": "Return the full extracted text of the PDF and every parsed question, in order.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "extracted_text": {"type": "string"},
+            "questions": EMIT_QUESTIONS_TOOL["input_schema"]["properties"]["questions"]
+        },
+        "required": ["extracted_text", "questions"]
+    }
+}
+_COMBINED_PROMPT_INTRO = """Extract all text content from this PDF (questions, options, tables, diagrams mentioned, answers if provided) in the order it appears, then structure the questions for PowerPoint slides."""
+_COMBINED_EXAM_INFO_RULE = """
+9. Exam information: If this is a previous year question paper, include the full exam information (e.g., "[CBSE 2023 (57/1/1)]", "[CBSE Delhi 2015 [HOTS]]") in the "exam_info" field for all questions."""
+_COMBINED_PROMPT_FOOTER = """
+
+Return the extracted text and the questions by calling the emit_extraction tool."""
+
+
+# Parsed config.yaml and API key, kept once found (failed lookups are retried on the next call)
+_config = None
+_api_key = ""
+
+
+def _load_config() -> dict:
+    """
+    Load config.yaml, parsing it only once per process after it loads successfully.
+    
+    Returns:
+        Parsed config dictionary, or None if the file is missing or unreadable
+    """
+    global _config
+    if _config is not None:
+        return _config
+    config_path = Path("config.yaml")  # Config file path
+    if not config_path.exists():  # Check if config file exists
+        return None
+    try:
+        import yaml  # For reading config file
+        with open(config_path, 'r') as f:
+            _config = yaml.safe_load(f)  # Load YAML config
+    except Exception:
+        # Config file read failed
+        return None
+    return _config
 
 
 def get_api_key() -> str:
     """
     Get API key from Streamlit secrets, config file, or environment variable.
-    Tries multiple sources in order of preference.
+    A found key is cached, so config.yaml is only parsed once per process; if no key
+    was found, the next call looks again (e.g. after secrets are configured).
+    
+    Returns:
+        API key string, or empty string if not found
+    """
+    global _api_key
+    if not _api_key:
+        _api_key = _lookup_api_key()
+    return _api_key
+
+
+def _lookup_api_key() -> str:
+    """
+    Look up the API key, trying multiple sources in order of preference.
     
     Returns:
         API key string, or empty string if not found
@@ -36,16 +211,14 @@ def get_api_key() -> str:
         pass
     
     # Try config file
-    try:
-        config_path = Path("config.yaml")  # Config file path
-        if config_path.exists():  # Check if config file exists
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)  # Load YAML config
-                # Get API key from nested structure: llm -> api_key
-                return config.get('llm', {}).get('api_key', '')
-    except:
-        # Config file read failed, continue to next method
-        pass
+    config = _load_config()
+    if config is not None:
+        try:
+            # Get API key from nested structure: llm -> api_key
+            return config.get('llm', {}).get('api_key', '')
+        except AttributeError:
+            # Unexpected config structure, continue to next method
+            pass
     
     # Try environment variable as fallback
     import os
@@ -62,23 +235,24 @@ def load_extracted_content(content_file: str) -> str:
     Returns:
         Content as string, or None if file not found
     """
+    from step1_pdf_extraction import EXTRACTED_CONTENT_TITLE  # Header written by Step 1
+    
     try:
         # Read the extracted content file
         with open(content_file, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Remove the header lines (=== separator and title)
-        # Find where actual content starts (after "EXTRACTED PDF CONTENT (via LLM)")
-        lines = content.split('\n')
-        # Skip header lines until we find the actual content
-        start_idx = 0
-        for i, line in enumerate(lines):
-            if line.strip() and not line.startswith('='):
-                start_idx = i
-                break
+        # Remove the header (=== separator, title, === separator, blank line)
+        # Only the top of the file is searched, so this doesn't scan the whole content
+        title_idx = content.find(EXTRACTED_CONTENT_TITLE, 0, 200)
+        if title_idx != -1:
+            body_start = content.find("\n\n", title_idx)
+            if body_start != -1:
+                # Return content starting from actual text
+                return content[body_start + 2:]
         
-        # Return content starting from actual text
-        return '\n'.join(lines[start_idx:])
+        # No Step 1 header - return the file as is
+        return content
     
     except FileNotFoundError:
         print(f"[ERROR] File not found: {content_file}")
@@ -128,6 +302,246 @@ def extract_exam_info_from_content(content: str) -> str:
     return ""
 
 
+def questions_from_message(message) -> list:
+    """
+    Get the question list from Claude's emit_questions tool call.
+    
+    Args:
+        message: Final Message returned by the Claude API
+        
+    Returns:
+        List of question dictionaries
+    """
+    for content_block in message.content:
+        if content_block.type == "tool_use" and content_block.name == EMIT_QUESTIONS_TOOL["name"]:
+            return content_block.input["questions"]
+    raise ValueError("Response did not contain an emit_questions tool call")
+
+
+def loads_json(json_text: str):
+    """
+    Decode JSON text, using orjson when it is installed.
+    orjson.JSONDecodeError is a subclass of json.JSONDecodeError, so callers catch either.
+    
+    Args:
+        json_text: JSON document as a string
+        
+    Returns:
+        Decoded Python object
+    """
+    if orjson is not None:
+        return orjson.loads(json_text)
+    return json.loads(json_text)
+
+
+def dumps_json(obj, indent: bool = False) -> bytes:
+    """
+    Encode an object as UTF-8 JSON bytes, using orjson when it is installed.
+    
+    Args:
+        obj: Object to encode
+        indent: Whether to pretty-print with 2-space indentation
+        
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def estimate_max_tokens(content: str, limit: int = PARSE_MAX_TOKENS) -> int:
+    """
+    Size the output budget to the content instead of always asking for the limit.
+    The estimate has headroom for JSON overhead; a response that still runs out is
+    retried at the limit (see _stream_questions_sized).
+    
+    Args:
+        content: Content that will be parsed in one request
+        limit: Largest budget to allow
+        
+    Returns:
+        max_tokens value for the request
+    """
+    estimate = int(len(content) / CHARS_PER_OUTPUT_TOKEN * PARSE_TOKEN_HEADROOM) + PARSE_TOKEN_OVERHEAD
+    return min(limit, max(PARSE_MIN_TOKENS, estimate))
+
+
+def split_by_question_markers(content: str, max_chars: int = PARSE_CHUNK_CHARS) -> list[str]:
+    """
+    Split content into chunks of about max_chars, cutting only at question boundaries.
+    Falls back to blank-line boundaries if the content has no question markers.
+    A single question longer than max_chars is kept whole in its own chunk.
+    
+    Args:
+        content: Extracted PDF content text
+        max_chars: Target maximum chunk size in characters
+        
+    Returns:
+        List of content chunks in order (a single chunk if content is short)
+    """
+    if len(content) <= max_chars:
+        return [content]
+    
+    boundaries = [m.start() for m in _QUESTION_BOUNDARY_RE.finditer(content)]
+    if len(boundaries) < 2:
+        boundaries = [m.end() for m in _PARAGRAPH_BREAK_RE.finditer(content)]
+    
+    chunks = []
+    chunk_start = 0
+    last_boundary = 0  # Latest boundary that still fits in the current chunk
+    for boundary in boundaries + [len(content)]:
+        if boundary - chunk_start > max_chars and last_boundary > chunk_start:
+            chunks.append(content[chunk_start:last_boundary])
+            chunk_start = last_boundary
+        last_boundary = boundary
+    chunks.append(content[chunk_start:])
+    
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+@lru_cache(maxsize=None)
+def get_client(api_key: str) -> "Anthropic":
+    """
+    Get the Anthropic client for an API key, created once per process. It shares
+    Step 1's connection pool, so parsing reuses the connections opened for extraction.
+    
+    Args:
+        api_key: Anthropic API key
+        
+    Returns:
+        Shared Anthropic client
+    """
+    from step1_pdf_extraction import get_pdf_extractor  # Owner of the shared client
+    # Same HTTP client as Step 1; only the timeout/retry policy differs
+    return get_pdf_extractor(api_key).client.with_options(max_retries=2, timeout=120.0)
+
+
+def _stream_questions(client, prompt, max_tokens: int, received: list = None, tool: dict = EMIT_QUESTIONS_TOOL):
+    """
+    Stream one forced tool call (emit_questions by default) from Claude API.
+    
+    Args:
+        client: Anthropic client
+        prompt: Parsing instructions + content (string, or list of content blocks)
+        max_tokens: Maximum response length
+        received: Optional one-item list counting characters received (for progress)
+        tool: Tool definition Claude must call
+        
+    Returns:
+        Final Message returned by the Claude API
+    """
+    with client.messages.stream(
+        model=CLAUDE_MODEL,  # Claude model version
+        max_tokens=max_tokens,  # Maximum response length
+        tools=[tool],  # Structured output via a forced tool call
+        tool_choice={"type": "tool", "name": tool["name"]},
+        messages=[{
+            "role": "user",  # User message
+            "content": prompt  # Parsing instructions + content
+        }]
+    ) as stream:
+        for event in stream:
+            if received is not None and event.type == "input_json":
+                received[0] += len(event.partial_json)
+                print(f"  Receiving response... {received[0]:,} characters", end='\r')
+        return stream.get_final_message()
+
+
+def _stream_questions_sized(client, prompt: str, content: str, limit: int = PARSE_MAX_TOKENS,
+                            received: list = None):
+    """
+    Stream an emit_questions call with an output budget sized to the content.
+    If the response is truncated at the estimate, it is retried once at the limit.
+    
+    Args:
+        client: Anthropic client
+        prompt: Parsing instructions + content
+        content: Content being parsed (used to size the budget)
+        limit: Largest budget to allow
+        received: Optional one-item list counting characters received (for progress)
+        
+    Returns:
+        Final Message returned by the Claude API (stop_reason is still "max_tokens"
+        if even the limit was not enough)
+    """
+    max_tokens = estimate_max_tokens(content, limit)
+    response = _stream_questions(client, prompt, max_tokens, received)
+    if response.stop_reason == "max_tokens" and max_tokens < limit:
+        print(f"\n[WARNING] Response was truncated at {max_tokens:,} tokens, retrying with {limit:,}...")
+        response = _stream_questions(client, prompt, limit, received)
+    return response
+
+
+async def _parse_chunk_async(client, sem: asyncio.Semaphore, i: int, prompt: str, chunk: str,
+                             cache: "LLMCache", received: list) -> list:
+    """
+    Parse one content chunk into question objects using Claude API.
+    The response is streamed (in a worker thread) so progress can be shown while it is generated.
+    
+    Args:
+        client: Anthropic client (shared across chunks)
+        sem: Semaphore bounding the number of in-flight requests
+        i: Chunk number (1-indexed)
+        prompt: Parsing instructions (ending with "Extracted Content:")
+        chunk: Content chunk to parse
+        cache: LLMCache used to skip chunks that were already parsed
+        received: One-item list counting characters received across all chunks (for progress)
+        
+    Returns:
+        List of question dictionaries, or None if parsing fails
+    """
+    # Return cached parse if this exact chunk + prompt was processed before
+    chunk_key = cache.make_key(PROMPT_VERSION, CLAUDE_MODEL, prompt, chunk)
+    cached_json = cache.get(chunk_key)
+    if cached_json:
+        return loads_json(cached_json)
+    
+    try:
+        async with sem:
+            response = await asyncio.to_thread(
+                _stream_questions_sized, client, prompt + chunk, chunk, PARSE_MAX_TOKENS, received
+            )
+        
+        if response.stop_reason == "max_tokens":
+            print(f"\n[ERROR] Chunk {i} response was truncated due to max_tokens limit!")
+            return None
+        
+        # The tool input is already decoded by the SDK (only cache complete responses)
+        questions = questions_from_message(response)
+        cache.set(chunk_key, dumps_json(questions).decode('utf-8'))
+        return questions
+        
+    except Exception as e:
+        print(f"\n[ERROR] LLM parsing failed for chunk {i}: {e}")
+        return None
+
+
+async def _parse_chunks_async(chunks: list[str], client, prompt: str) -> list:
+    """
+    Send all content chunks to Claude API concurrently.
+    
+    Args:
+        chunks: Content chunks in order
+        client: Anthropic client from get_client()
+        prompt: Parsing instructions shared by every chunk
+        
+    Returns:
+        List of per-chunk question lists (None for failed chunks) in order
+    """
+    from step1_pdf_extraction import LLMCache  # Persistent LLM response cache shared with Step 1
+    
+    sem = asyncio.Semaphore(PARSE_CONCURRENCY)
+    cache = LLMCache()
+    received = [0]  # Characters received so far, across all chunks
+    results = await asyncio.gather(
+        *[_parse_chunk_async(client, sem, i, prompt, chunk, cache, received) for i, chunk in enumerate(chunks, 1)]
+    )
+    if received[0]:
+        print()  # Finish the progress line
+    return results
+
+
 def parse_questions_with_llm(content: str, api_key: str, extract_year: bool = False) -> list:
     """
     Parse extracted content into structured question objects using Claude API.
@@ -151,108 +565,25 @@ def parse_questions_with_llm(content: str, api_key: str, extract_year: bool = Fa
             print(f"[INFO] Extracted exam info: {exam_info}")
     
     try:
-        # Initialize Anthropic client
-        client = Anthropic(api_key=api_key)
-        
-        # Build parsing prompt
-        prompt = """Parse the following extracted PDF content and structure it for PowerPoint slides.
-
-Rules:
-1. Ignore question numbers from PDF - number sequentially as Q1, Q2, Q3... based on order they appear
-2. Maintain the exact order as questions appear in PDF
-3. For each question, create slide objects:
-   - Question slide: Contains question text (all parts if multi-part), options (if any), structured table data (if any), diagram description in brackets [description] (if any)
-   - Answer slide: Contains answer (if provided) - comes AFTER question slide
-4. Passage-based questions: 
-   - Passage gets its own slide BEFORE questions
-   - Then question slide(s) follow
-   - Then answer slide(s) follow
-5. Multi-part questions: Keep all parts (i), (ii), etc. together on same question slide
-6. Tables: Parse into structured format with "headers" array and "rows" array (each row is an array)
-7. Diagrams: Extract description and wrap in brackets [description] for manual addition later
-8. Multiple choice options: Keep as array of strings like ["a) option1", "b) option2", ...]"""
-        
-        # Add exam info to JSON structure if enabled
+        # Build parsing prompt (the constant parts are module-level)
         if extract_year and exam_info:
-            prompt += f"""
-9. Exam information: If exam info "{exam_info}" was found in the content, include it in the "exam_info" field for all questions."""
-        
-        prompt += """
-
-Return ONLY valid JSON array with this structure:"""
-        
-        # Build JSON structure
-        json_structure = """[
-  {
-    "question_number": "Q1",
-    "question_type": "regular" | "multi_part" | "multiple_choice" | "passage_based","""
+            prompt = _PROMPT_RULES + _PROMPT_EXAM_INFO_RULE.format(exam_info=exam_info) + _PROMPT_FOOTER
+        else:
+            prompt = _PROMPT_HEADER
         
-        if extract_year and exam_info:
-            json_structure += f'''
-    "exam_info": "{exam_info}",'''
-        
-        json_structure += """
-    "slides": [
-      {
-        "slide_type": "question" | "answer" | "passage",
-        "content": {
-          "question_text": "...",
-          "options": ["a) ...", "b) ..."] or [],
-          "table": {"headers": [...], "rows": [[...], [...]]} or null,
-          "diagram_description": "[description]" or null,
-          "passage": "..." or null
-        }
-      },
-      {
-        "slide_type": "answer",
-        "content": {
-          "answer_text": "..."
-        }
-      }
-    ]
-  }
-]"""
-        
-        prompt += json_structure + """
-
-Extracted Content:
-""" + content
+        # Split long content at question boundaries and parse the chunks concurrently
+        chunks = split_by_question_markers(content)
+        if len(chunks) > 1:
+            print(f"[INFO] Large content ({len(content):,} characters): parsing {len(chunks)} chunks concurrently...")
+        chunk_results = asyncio.run(_parse_chunks_async(chunks, get_client(api_key), prompt))
         
-        # Call Claude API with streaming for long requests
-        response = client.messages.create(
-            model="claude-sonnet-4-5-20250929",  # Claude model version
-            max_tokens=32000,  # Maximum response length (increased for larger PDFs)
-            messages=[{
-                "role": "user",  # User message
-                "content": prompt  # Parsing instructions + content
-            }],
-            stream=True  # Enable streaming for long requests
-        )
+        if any(result is None for result in chunk_results):
+            return None
         
-        # Collect streaming response
-        response_text = ""
-        for event in response:
-            if event.type == "content_block_delta":
-                if hasattr(event, 'delta') and hasattr(event.delta, 'text'):
-                    response_text += event.delta.text
-        
-        # Try to extract JSON from response (might have markdown code blocks)
-        json_text = response_text
-        
-        # Remove markdown code blocks if present
-        if "```json" in json_text:
-            # Extract JSON from markdown code block
-            start = json_text.find("```json") + 7
-            end = json_text.find("```", start)
-            json_text = json_text[start:end].strip()
-        elif "```" in json_text:
-            # Extract JSON from generic code block
-            start = json_text.find("```") + 3
-            end = json_text.find("```", start)
-            json_text = json_text[start:end].strip()
-        
-        # Parse JSON
-        questions = json.loads(json_text)
+        # Merge chunks in order; each chunk was numbered from Q1, so renumber the combined list
+        questions = [q for result in chunk_results for q in result]
+        if len(chunks) > 1:
+            questions = renumber_questions_sequential(questions, 1)
         
         # Add exam_info to all questions if extracted and not already present
         if extract_year and exam_info:
@@ -265,179 +596,339 @@ Extracted Content:
             print(f"[INFO] Exam info {exam_info} included in all questions")
         return questions
         
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] Failed to parse JSON response: {e}")
-        print("[INFO] Response preview:")
-        print(response_text[:500])
-        return None
     except Exception as e:
         print(f"[ERROR] LLM parsing failed: {e}")
         return None
 
 
-def validate_questions(questions: list) -> tuple:
+def extract_and_parse_with_llm(pdf_path: str, api_key: str, extract_year: bool = False, pdf_bytes: bytes = None) -> tuple:
+    """
+    Run Step 1 and Step 2 as a single Claude request: the PDF is sent once and
+    Claude returns both the extracted text and the structured questions.
+    PDFs over COMBINED_MAX_PAGES pages are left to the two-step path.
+    
+    Args:
+        pdf_path: Path to PDF file
+        api_key: Anthropic API key
+        extract_year: Whether to extract and include exam information (default: False)
+        pdf_bytes: PDF content already in memory; read from pdf_path if None
+        
+    Returns:
+        Tuple of (extracted_text: str, questions: list). If the response was
+        truncated after the extracted text was complete, questions is None and
+        only the parse step needs to run. (None, None) if the PDF is too large
+        or the request fails (caller then runs the two steps).
+    """
+    import base64  # For encoding the PDF attachment
+    import io  # For reading the page count from bytes
+    from PyPDF2 import PdfReader  # For the page count
+    from step1_pdf_extraction import LLMCache, load_pdf_bytes
+    
+    if pdf_bytes is None:
+        pdf_bytes = load_pdf_bytes(pdf_path)
+    if not pdf_bytes:
+        return None, None
+    
+    try:
+        num_pages = len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+    except Exception:
+        return None, None
+    if num_pages > COMBINED_MAX_PAGES:
+        print(f"[INFO] Large PDF ({num_pages} pages): using separate extraction and parsing steps")
+        return None, None
+    
+    prompt = _COMBINED_PROMPT_INTRO + "\n\n" + _PROMPT_RULE_LIST
+    if extract_year:
+        prompt += _COMBINED_EXAM_INFO_RULE
+    prompt += _COMBINED_PROMPT_FOOTER
+    
+    # Return cached result if this exact PDF + prompt was processed before
+    cache = LLMCache()
+    cache_key = cache.make_key(PROMPT_VERSION, CLAUDE_MODEL, prompt, pdf_bytes)
+    cached_json = cache.get(cache_key)
+    if cached_json:
+        result = loads_json(cached_json)
+        print(f"[OK] Using cached extraction: {len(result['questions'])} questions")
+        return result['extracted_text'], result['questions']
+    
+    print("[INFO] Sending PDF to Claude API for extraction and parsing in one request...")
+    try:
+        received = [0]
+        response = _stream_questions(
+            get_client(api_key),
+            [
+                {"type": "text", "text": prompt},
+                {
+                    "type": "document",  # PDF document attachment
+                    "source": {
+                        "type": "base64",
+                        "media_type": "application/pdf",
+                        "data": base64.b64encode(pdf_bytes).decode('utf-8')
+                    }
+                }
+            ],
+            COMBINED_MAX_TOKENS,
+            received,
+            tool=EXTRACT_AND_EMIT_TOOL
+        )
+        if received[0]:
+            print()  # Finish the progress line
+        
+        result = next(block.input for block in response.content if block.type == "tool_use")
+        
+        if response.stop_reason == "max_tokens":
+            # The text is emitted before the questions, so it is complete once "questions" has started
+            if 'questions' in result and result.get('extracted_text'):
+                print("[WARNING] Combined response was truncated in the questions, parsing the extracted text separately")
+                return result['extracted_text'], None
+            print("[WARNING] Combined response was truncated, using separate extraction and parsing steps")
+            return None, None
+        
+        extracted_text, questions = result['extracted_text'], result['questions']
+    except Exception as e:
+        print(f"[WARNING] Combined extraction and parsing failed ({e}), using separate steps")
+        return None, None
+    
+    cache.set(cache_key, dumps_json(result).decode('utf-8'))
+    print(f"[OK] Extracted {len(extracted_text):,} characters and parsed {len(questions)} questions")
+    return extracted_text, questions
+
+
+def validate_questions(questions: list, preview_parts: list = None) -> tuple:
     """
     Validate parsed questions structure.
+    Statistics are gathered in the same pass, using local counters.
     
     Args:
         questions: List of question dictionaries
+        preview_parts: If given, preview lines for each question are appended in the same pass
         
     Returns:
         Tuple of (is_valid: bool, issues: list, stats: dict)
     """
     issues = []  # List to store validation issues
-    stats = {  # Statistics dictionary
-        'total_questions': len(questions),
-        'total_slides': 0,
-        'questions_with_answers': 0,
-        'questions_with_options': 0,
-        'questions_with_tables': 0,
-        'questions_with_diagrams': 0,
-        'passage_based': 0
-    }
+    total_slides = 0
+    questions_with_answers = 0
+    questions_with_options = 0
+    questions_with_tables = 0
+    questions_with_diagrams = 0
+    passage_based = 0
     
     # Validate each question
-    for i, q in enumerate(questions):
+    for i, q in enumerate(questions, 1):
+        if preview_parts is not None:
+            _add_question_preview(q, preview_parts)
+        
         # Check required fields
         if 'question_number' not in q:
-            issues.append(f"Question {i+1}: Missing question_number")
+            issues.append(f"Question {i}: Missing question_number")
         if 'question_type' not in q:
-            issues.append(f"Question {i+1}: Missing question_type")
+            issues.append(f"Question {i}: Missing question_type")
         if 'slides' not in q:
-            issues.append(f"Question {i+1}: Missing slides")
+            issues.append(f"Question {i}: Missing slides")
             continue
         
         # Count slides for this question
-        stats['total_slides'] += len(q['slides'])
-        
-        # Check slide structure
-        has_answer = False
-        has_options = False
-        has_table = False
-        has_diagram = False
+        slides = q['slides']
+        total_slides += len(slides)
         
-        for slide in q['slides']:
+        # Tag which content kinds this question has (one lookup per field);
+        # empty options, null table and empty description don't count
+        tags = set()
+        for slide in slides:
             if slide.get('slide_type') == 'answer':
-                has_answer = True
-                stats['questions_with_answers'] += 1
+                questions_with_answers += 1  # Counted per answer slide
             
-            content = slide.get('content', {})
-            
-            # Check for options
-            if content.get('options') and len(content['options']) > 0:
-                has_options = True
-            
-            # Check for table
-            if content.get('table') and content['table'] is not None:
-                has_table = True
-            
-            # Check for diagram
-            if content.get('diagram_description') and content['diagram_description']:
-                has_diagram = True
-        
-        if has_options:
-            stats['questions_with_options'] += 1
-        if has_table:
-            stats['questions_with_tables'] += 1
-        if has_diagram:
-            stats['questions_with_diagrams'] += 1
-        if q.get('question_type') == 'passage_based':
-            stats['passage_based'] += 1
+            content = slide.get('content') or {}
+            if content.get('options'):
+                tags.add('opt')
+            if content.get('table'):
+                tags.add('tbl')
+            if content.get('diagram_description'):
+                tags.add('dia')
+        
+        questions_with_options += 'opt' in tags
+        questions_with_tables += 'tbl' in tags
+        questions_with_diagrams += 'dia' in tags
+        passage_based += q.get('question_type') == 'passage_based'
+    
+    stats = {  # Statistics dictionary
+        'total_questions': len(questions),
+        'total_slides': total_slides,
+        'non_answer_slides': total_slides - questions_with_answers,  # Slide count when answers are excluded
+        'questions_with_answers': questions_with_answers,
+        'questions_with_options': questions_with_options,
+        'questions_with_tables': questions_with_tables,
+        'questions_with_diagrams': questions_with_diagrams,
+        'passage_based': passage_based
+    }
     
     is_valid = len(issues) == 0
     return is_valid, issues, stats
 
 
+def _write_output(output_file: str, write, *args):
+    """
+    Call write(*args) to write output_file, creating the output directory and
+    retrying once if it doesn't exist (callers normally create it up front).
+    
+    Args:
+        output_file: Path of the file being written
+        write: Function that writes the file
+        *args: Arguments for write
+    """
+    try:
+        write(*args)
+    except FileNotFoundError:
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        write(*args)
+
+
 def save_parsed_questions(questions: list, output_file: str):
     """
     Save parsed questions to JSON file.
+    The output directory is created if it doesn't exist.
     
     Args:
         questions: List of question dictionaries
         output_file: Path to output JSON file
     """
-    # Create output directory if it doesn't exist
-    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-    
-    # Save as formatted JSON
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(questions, f, indent=2, ensure_ascii=False)
+    # Save as formatted JSON (encoded in memory, then written in one call)
+    _write_output(output_file, Path(output_file).write_bytes, dumps_json(questions, indent=True))
     
     print(f"[OK] Parsed questions saved to: {output_file}")
 
 
-def create_preview(questions: list, preview_file: str):
+_PREVIEW_HEADER = "=" * 60 + "\n" + "PARSED QUESTIONS PREVIEW\n" + "=" * 60 + "\n\n"
+
+
+def _truncate(text: str, limit: int) -> str:
     """
-    Create human-readable preview of parsed questions.
+    Shorten text for the preview, adding "..." if it was cut.
     
     Args:
-        questions: List of question dictionaries
-        preview_file: Path to preview text file
+        text: Text to shorten
+        limit: Maximum number of characters kept
+        
+    Returns:
+        Text unchanged if short enough, otherwise its first limit characters + "..."
+    """
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _add_question_preview(q: dict, parts: list):
+    """
+    Append the preview lines for one question.
+    
+    Args:
+        q: Question dictionary
+        parts: List of preview strings to append to
     """
-    # Create output directory if it doesn't exist
-    Path(preview_file).parent.mkdir(parents=True, exist_ok=True)
+    q_num = q.get('question_number', 'Unknown')
+    q_type = q.get('question_type', 'unknown')
+    exam_info = q.get('exam_info', '')
     
-    with open(preview_file, 'w', encoding='utf-8') as f:
-        f.write("=" * 60 + "\n")
-        f.write("PARSED QUESTIONS PREVIEW\n")
-        f.write("=" * 60 + "\n\n")
+    exam_str = f"\n  Exam: {exam_info}" if exam_info else ""
+    parts.append(f"\n{q_num} ({q_type.upper()}){exam_str}\n")
+    parts.append("-" * 60 + "\n")
+    
+    # Add slides
+    for slide_idx, slide in enumerate(q.get('slides', []), 1):
+        slide_type = slide.get('slide_type', 'unknown')
+        parts.append(f"\n  Slide {slide_idx}: {slide_type.upper()}\n")
+        
+        content = slide.get('content', {})
+        
+        if slide_type == 'passage':
+            # Add passage
+            parts.append(f"    Passage: {_truncate(content.get('passage', ''), 200)}\n")
         
-        # Write each question
-        for q in questions:
-            q_num = q.get('question_number', 'Unknown')
-            q_type = q.get('question_type', 'unknown')
-            exam_info = q.get('exam_info', '')
+        elif slide_type == 'question':
+            # Add question text
+            parts.append(f"    Question: {_truncate(content.get('question_text', ''), 150)}\n")
             
-            exam_str = f"\n  Exam: {exam_info}" if exam_info else ""
-            f.write(f"\n{q_num} ({q_type.upper()}){exam_str}\n")
-            f.write("-" * 60 + "\n")
+            # Add options if present
+            options = content.get('options', [])
+            if options:
+                parts.append(f"    Options: {len(options)} options\n")
+                for opt in options[:2]:  # Show first 2
+                    parts.append(f"      - {_truncate(opt, 80)}\n")
             
-            # Write slides
-            for slide_idx, slide in enumerate(q.get('slides', []), 1):
-                slide_type = slide.get('slide_type', 'unknown')
-                f.write(f"\n  Slide {slide_idx}: {slide_type.upper()}\n")
-                
-                content = slide.get('content', {})
-                
-                if slide_type == 'passage':
-                    # Write passage
-                    passage = content.get('passage', '')
-                    f.write(f"    Passage: {passage[:200]}...\n" if len(passage) > 200 else f"    Passage: {passage}\n")
-                
-                elif slide_type == 'question':
-                    # Write question text
-                    q_text = content.get('question_text', '')
-                    f.write(f"    Question: {q_text[:150]}...\n" if len(q_text) > 150 else f"    Question: {q_text}\n")
-                    
-                    # Write options if present
-                    options = content.get('options', [])
-                    if options:
-                        f.write(f"    Options: {len(options)} options\n")
-                        for opt in options[:2]:  # Show first 2
-                            f.write(f"      - {opt[:80]}...\n" if len(opt) > 80 else f"      - {opt}\n")
-                    
-                    # Write table info if present
-                    table = content.get('table')
-                    if table:
-                        headers = table.get('headers', [])
-                        rows = table.get('rows', [])
-                        f.write(f"    Table: {len(headers)} columns, {len(rows)} rows\n")
-                    
-                    # Write diagram info if present
-                    diagram = content.get('diagram_description')
-                    if diagram:
-                        f.write(f"    Diagram: {diagram[:100]}...\n" if len(diagram) > 100 else f"    Diagram: {diagram}\n")
-                
-                elif slide_type == 'answer':
-                    # Write answer
-                    answer = content.get('answer_text', '')
-                    f.write(f"    Answer: {answer[:150]}...\n" if len(answer) > 150 else f"    Answer: {answer}\n")
+            # Add table info if present
+            table = content.get('table')
+            if table:
+                headers = table.get('headers', [])
+                rows = table.get('rows', [])
+                parts.append(f"    Table: {len(headers)} columns, {len(rows)} rows\n")
             
-            f.write("\n")
+            # Add diagram info if present
+            diagram = content.get('diagram_description')
+            if diagram:
+                parts.append(f"    Diagram: {_truncate(diagram, 100)}\n")
+        
+        elif slide_type == 'answer':
+            # Add answer
+            parts.append(f"    Answer: {_truncate(content.get('answer_text', ''), 150)}\n")
+    
+    parts.append("\n")
+
+
+def create_preview(questions: list, preview_file: str):
+    """
+    Create human-readable preview of parsed questions.
+    The preview is built as a list of strings and written in one call.
+    
+    Args:
+        questions: List of question dictionaries
+        preview_file: Path to preview text file
+    """
+    parts = [_PREVIEW_HEADER]
+    
+    # Add each question
+    for q in questions:
+        _add_question_preview(q, parts)
+    
+    _write_preview(parts, preview_file)
+
+
+def _write_preview(parts: list, preview_file: str):
+    """
+    Write preview strings to the preview file in one call.
+    The output directory is created if it doesn't exist.
+    
+    Args:
+        parts: Preview strings, starting with the header
+        preview_file: Path to preview text file
+    """
+    def write(text: str):
+        with open(preview_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(text)
+    
+    _write_output(preview_file, write, "".join(parts))
     
     print(f"[OK] Preview saved to: {preview_file}")
 
 
+def process_questions(questions: list, output_file: str, preview_file: str) -> tuple:
+    """
+    Validate, save and preview parsed questions, walking the question list once.
+    Validation and preview share one pass; the JSON is encoded in a single call.
+    
+    Args:
+        questions: List of question dictionaries
+        output_file: Path to output JSON file
+        preview_file: Path to preview text file
+        
+    Returns:
+        Tuple of (is_valid: bool, issues: list, stats: dict), as from validate_questions()
+    """
+    parts = [_PREVIEW_HEADER]
+    is_valid, issues, stats = validate_questions(questions, parts)
+    save_parsed_questions(questions, output_file)
+    _write_preview(parts, preview_file)
+    return is_valid, issues, stats
+
+
 def parse_questions_with_llm_offset(content: str, api_key: str, start_question_number: int = 1, extract_year: bool = False) -> list:
     """
     Parse extracted content into structured question objects using Claude API
@@ -463,8 +954,8 @@ def parse_questions_with_llm_offset(content: str, api_key: str, start_question_n
             print(f"[INFO] Extracted exam info: {exam_info}")
     
     try:
-        # Initialize Anthropic client
-        client = Anthropic(api_key=api_key)
+        # Shared Anthropic client (reuses its connection pool)
+        client = get_client(api_key)
         
         # Build parsing prompt
         prompt = f"""Parse the following extracted PDF content and structure it for PowerPoint slides.
@@ -490,78 +981,22 @@ Rules:
             prompt += f"""
 10. Exam information: If exam info "{exam_info}" was found in the content, include it in the "exam_info" field for all questions."""
         
-        prompt += f"""
-
-Return ONLY valid JSON array with this structure:
-[
-  {{
-    "question_number": "Q{start_question_number}",
-    "question_type": "regular" | "multi_part" | "multiple_choice" | "passage_based","""
-        
-        if extract_year and exam_info:
-            prompt += f'''
-    "exam_info": "{exam_info}",'''
-        
         prompt += """
-    "slides": [
-      {{
-        "slide_type": "question" | "answer" | "passage",
-        "content": {{
-          "question_text": "...",
-          "options": ["a) ...", "b) ..."] or [],
-          "table": {{"headers": [...], "rows": [[...], [...]]}} or null,
-          "diagram_description": "[description]" or null,
-          "passage": "..." or null
-        }}
-      }},
-      {{
-        "slide_type": "answer",
-        "content": {{
-          "answer_text": "..."
-        }}
-      }}
-    ]
-  }}
-]
+
+Return the questions by calling the emit_questions tool.
 
 Extracted Content:
 """ + content
         
-        # Call Claude API with streaming for long requests
-        response = client.messages.create(
-            model="claude-sonnet-4-5-20250929",  # Claude model version
-            max_tokens=32000,  # Maximum response length (increased for larger PDFs)
-            messages=[{
-                "role": "user",  # User message
-                "content": prompt  # Parsing instructions + content
-            }],
-            stream=True  # Enable streaming for long requests
-        )
+        # Call Claude API with streaming for long requests (up to 32000 tokens for larger PDFs)
+        response = _stream_questions_sized(client, prompt, content, 32000)
+        
+        if response.stop_reason == "max_tokens":
+            print("[ERROR] Response was truncated due to max_tokens limit!")
+            return None
         
-        # Collect streaming response
-        response_text = ""
-        for event in response:
-            if event.type == "content_block_delta":
-                if hasattr(event, 'delta') and hasattr(event.delta, 'text'):
-                    response_text += event.delta.text
-        
-        # Try to extract JSON from response (might have markdown code blocks)
-        json_text = response_text
-        
-        # Remove markdown code blocks if present
-        if "```json" in json_text:
-            # Extract JSON from markdown code block
-            start = json_text.find("```json") + 7
-            end = json_text.find("```", start)
-            json_text = json_text[start:end].strip()
-        elif "```" in json_text:
-            # Extract JSON from generic code block
-            start = json_text.find("```") + 3
-            end = json_text.find("```", start)
-            json_text = json_text[start:end].strip()
-        
-        # Parse JSON
-        questions = json.loads(json_text)
+        # The tool input is already decoded by the SDK
+        questions = questions_from_message(response)
         
         # Add exam_info to all questions if extracted and not already present
         if extract_year and exam_info:
@@ -574,11 +1009,6 @@ Extracted Content:
             print(f"[INFO] Exam info {exam_info} included in all questions")
         return questions
         
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] Failed to parse JSON response: {e}")
-        print("[INFO] Response preview:")
-        print(response_text[:500])
-        return None
     except Exception as e:
         print(f"[ERROR] LLM parsing failed: {e}")
         return None
@@ -704,9 +1134,12 @@ if __name__ == '__main__':
         print("[ERROR] Failed to parse questions")
         sys.exit(1)
     
-    # Validate parsed questions
+    # Validate parsed questions, then save them and a preview (named after PDF)
     print("\n[INFO] Validating parsed questions...")
-    is_valid, issues, stats = validate_questions(questions)
+    output_file = f"output/parsed_questions_{pdf_name}.json"
+    preview_file = f"output/parsed_questions_{pdf_name}_preview.txt"
+    Path("output").mkdir(parents=True, exist_ok=True)  # Created once for both files
+    is_valid, issues, stats = process_questions(questions, output_file, preview_file)
     
     if issues:
         print(f"[WARNING] Found {len(issues)} validation issues:")
@@ -717,32 +1150,23 @@ if __name__ == '__main__':
     else:
         print("[OK] All questions validated successfully")
     
-    # Save parsed questions (named after PDF)
-    output_file = f"output/parsed_questions_{pdf_name}.json"
-    save_parsed_questions(questions, output_file)
-    
-    # Create preview (named after PDF)
-    preview_file = f"output/parsed_questions_{pdf_name}_preview.txt"
-    create_preview(questions, preview_file)
-    
-    # Print summary
-    print(f"\n[SUMMARY]")
-    print(f"Total questions parsed: {stats['total_questions']}")
-    print(f"Total slides to generate: {stats['total_slides']}")
-    print(f"Questions with answers: {stats['questions_with_answers']}")
-    print(f"Questions with options: {stats['questions_with_options']}")
-    print(f"Questions with tables: {stats['questions_with_tables']}")
-    print(f"Questions with diagrams: {stats['questions_with_diagrams']}")
-    print(f"Passage-based questions: {stats['passage_based']}")
-    
-    print(f"\n[REVIEW CHECKLIST]")
-    print(f"Please review: {preview_file}")
-    print("  [ ] Are all questions properly parsed?")
-    print("  [ ] Are multi-part questions kept together?")
-    print("  [ ] Are passage-based questions detected correctly?")
-    print("  [ ] Are tables structured correctly?")
-    print("  [ ] Are diagram descriptions in brackets [description]?")
-    print("  [ ] Are answers on separate slides after questions?")
-    print("\nOnce verified, we can proceed to Step 3: Template Analysis")
-
-
+    # Print summary and review checklist in one write
+    print(
+        f"\n[SUMMARY]\n"
+        f"Total questions parsed: {stats['total_questions']}\n"
+        f"Total slides to generate: {stats['total_slides']}\n"
+        f"Questions with answers: {stats['questions_with_answers']}\n"
+        f"Questions with options: {stats['questions_with_options']}\n"
+        f"Questions with tables: {stats['questions_with_tables']}\n"
+        f"Questions with diagrams: {stats['questions_with_diagrams']}\n"
+        f"Passage-based questions: {stats['passage_based']}\n"
+        f"\n[REVIEW CHECKLIST]\n"
+        f"Please review: {preview_file}\n"
+        "  [ ] Are all questions properly parsed?\n"
+        "  [ ] Are multi-part questions kept together?\n"
+        "  [ ] Are passage-based questions detected correctly?\n"
+        "  [ ] Are tables structured correctly?\n"
+        "  [ ] Are diagram descriptions in brackets [description]?\n"
+        "  [ ] Are answers on separate slides after questions?\n"
+        "\nOnce verified, we can proceed to Step 3: Template Analysis"
+    )
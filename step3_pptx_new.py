@@ -13,12 +13,70 @@ Reference: https://python-pptx.readthedocs.io/en/latest/
 """
 import json
 import re
+import copy
+import os
+import uuid
+import zipfile
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+try:
+    import orjson  # Faster JSON decoding when available
+except ImportError:
+    orjson = None
 from pathlib import Path
 from pptx import Presentation
-from pptx.util import Inches, Pt
+from pptx.util import Inches, Pt, Emu, lazyproperty
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.slide import SlidePart
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.opc.serialized import PackageWriter, _ZipPkgWriter
+from lxml import etree
+
+
+# Numbered line like "Q1. text" or "Ans12 text": prefix, number, dots after the number, rest of the line
+_NUM_RE = re.compile(r'^(Q|Ans)(\d+)\s*(\.*)\s*(.*)$')
+
+# Option label table cell like "(a)" or "(B)" (a single letter in parentheses)
+_OPT_LABEL_RE = re.compile(r'\(([^\W\d_])\)')
+
+# Deflate level for saved decks (zlib default is 6); slide XML still compresses well at level 1
+SAVE_COMPRESS_LEVEL = 1
+# Already-compressed media parts are stored as is (deflating them again only costs time)
+STORED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif'})
+
+
+class _FastZipPkgWriter(_ZipPkgWriter):
+    """python-pptx zip writer that deflates at SAVE_COMPRESS_LEVEL and stores compressed media."""
+    
+    def write(self, pack_uri, blob: bytes):
+        """Write `blob` to the zip package, without deflate for STORED_EXTENSIONS parts."""
+        if pack_uri.ext.lower() in STORED_EXTENSIONS:
+            self._zipf.writestr(pack_uri.membername, blob, compress_type=zipfile.ZIP_STORED)
+        else:
+            self._zipf.writestr(pack_uri.membername, blob)
+    
+    @lazyproperty
+    def _zipf(self) -> zipfile.ZipFile:
+        """`ZipFile` instance open for writing."""
+        return zipfile.ZipFile(
+            self._pkg_file, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=SAVE_COMPRESS_LEVEL,
+            strict_timestamps=False
+        )
+
+
+class _FastPackageWriter(PackageWriter):
+    """python-pptx package writer that writes through _FastZipPkgWriter."""
+    
+    def _write(self):
+        with _FastZipPkgWriter(self._pkg_file) as phys_writer:
+            self._write_content_types_stream(phys_writer)
+            self._write_pkg_rels(phys_writer)
+            self._write_parts(phys_writer)
 
 
 class PPTXGenerator:
@@ -42,25 +100,13 @@ class PPTXGenerator:
     CANVA_CANVAS_WIDTH_PX = 1920  # Standard Canva widescreen width
     CANVA_CANVAS_HEIGHT_PX = 1080  # Standard Canva widescreen height
     
-    # Convert Canva pixel positions to PowerPoint inches
-    # Scale factor: PowerPoint width (13.333") / Canva width (1920px)
-    SCALE_X = 13.333 / CANVA_CANVAS_WIDTH_PX
-    SCALE_Y = 7.5 / CANVA_CANVAS_HEIGHT_PX
-    
-    # Calculate correction ratios based on actual vs desired Canva values
-    # When we set X based on 73.6px, Canva shows 88.1px
-    # Correction ratio: desired / actual = 73.6 / 88.1 = 0.835
-    CORRECTION_X = 73.6 / 88.1  # ~0.835
-    CORRECTION_Y = 162.3 / 176.8  # ~0.918
-    CORRECTION_WIDTH = 1773.3 / 1745.8  # ~1.016
-    CORRECTION_HEIGHT = 510.7 / 482.3  # ~1.059
-    
-    # Apply corrections to get PowerPoint values that will result in desired Canva values
-    # Text box position and size (corrected to achieve desired Canva values)
-    TEXTBOX_LEFT = Inches(73.6 * SCALE_X * CORRECTION_X)      # Will result in Canva X=73.6px
-    TEXTBOX_TOP = Inches(162.3 * SCALE_Y * CORRECTION_Y)       # Will result in Canva Y=162.3px
-    TEXTBOX_WIDTH = Inches(1773.3 * SCALE_X * CORRECTION_WIDTH)  # Will result in Canva Width=1773.3px
-    TEXTBOX_HEIGHT = Inches(510.7 * SCALE_Y * CORRECTION_HEIGHT)  # Will result in Canva Height=510.7px
+    # Text box position and size, precomputed in EMU as Inches(Canva px × scale × correction):
+    #   scale = 13.333" / 1920px across, 7.5" / 1080px down
+    #   correction = desired / actual Canva value (e.g. X set from 73.6px shows as 88.1px)
+    TEXTBOX_LEFT = Emu(390429)      # 73.6 × 13.333/1920 × 73.6/88.1 → Canva X=73.6px
+    TEXTBOX_TOP = Emu(946081)       # 162.3 × 7.5/1080 × 162.3/176.8 → Canva Y=162.3px
+    TEXTBOX_WIDTH = Emu(11437544)   # 1773.3 × 13.333/1920 × 1773.3/1745.8 → Canva Width=1773.3px
+    TEXTBOX_HEIGHT = Emu(3433904)   # 510.7 × 7.5/1080 × 510.7/482.3 → Canva Height=510.7px
     
     # Content area margins (for fallback/other elements)
     MARGIN_LEFT = Inches(0.75)
@@ -82,12 +128,28 @@ class PPTXGenerator:
     FONT_SIZE_PASSAGE = FONT_SIZE_UNIFIED
     FONT_SIZE_TABLE = Pt(18)  # Table font size (increased to 18pt)
     
+    # Decks with at least this many questions are built in parallel worker processes
+    PARALLEL_MIN_QUESTIONS = 200
+    
+    # Formatting values shared by every text box, paragraph and run (built once, not per call)
+    TEXT_MARGIN = Inches(0.15)  # Inner margin on all four sides of text boxes
+    PARAGRAPH_SPACING = Pt(8)  # Space after each line except the last
+    NO_SPACING = Pt(0)
+    TEXT_COLOR = RGBColor(0, 0, 0)  # Black
+    HEADER_FILL_COLOR = RGBColor(240, 240, 240)  # Light gray table header
+    HEADER_FILL = parse_xml(  # Prototype <a:solidFill> copied into each header cell
+        f'<a:solidFill {nsdecls("a")}><a:srgbClr val="{HEADER_FILL_COLOR}"/></a:solidFill>'
+    )
+    
     def __init__(self):
         """Initialize a new presentation."""
         self.prs = Presentation()
         self.prs.slide_width = self.SLIDE_WIDTH
         self.prs.slide_height = self.SLIDE_HEIGHT
         self.answer_counter = 1
+        self._next_slide_id = self.prs.slides._sldIdLst._next_id  # Tracked by _add_slide()
+        self._blank_layout = self.prs.slide_layouts[6]  # Blank layout (index 6 is typically blank), looked up once
+        self._run_prototypes = {}  # (font size, bold, color) -> prototype <a:r> element, see _build_run()
     
     def create_blank_slide(self):
         """
@@ -96,9 +158,30 @@ class PPTXGenerator:
         Returns:
             Slide object
         """
-        # Use blank layout (index 6 is typically blank)
-        blank_layout = self.prs.slide_layouts[6]
-        slide = self.prs.slides.add_slide(blank_layout)
+        return self._add_slide(self._blank_layout)
+    
+    def _add_slide(self, slide_layout):
+        """
+        Add a slide like Slides.add_slide(), without its per-slide scans.
+        
+        python-pptx searches all of the presentation's relationships for an existing
+        link to the new slide, and all slide ids for the largest one, on every
+        add_slide() call, which makes building a deck O(N^2). A new slide part can't
+        already be linked and ids only grow, so the next id is tracked here instead.
+        
+        Args:
+            slide_layout: Layout the new slide inherits from
+            
+        Returns:
+            Slide object
+        """
+        prs_part = self.prs.part
+        slide_part = SlidePart.new(prs_part._next_slide_partname, prs_part.package, slide_layout.part)
+        rId = prs_part.rels._add_relationship(RT.SLIDE, slide_part)
+        slide = slide_part.slide
+        slide.shapes.clone_layout_placeholders(slide_layout)
+        self.prs.slides._sldIdLst._add_sldId(id=self._next_slide_id, rId=rId)
+        self._next_slide_id += 1
         return slide
     
     def add_text_box(self, slide, text: str, left: Inches, top: Inches, 
@@ -130,20 +213,20 @@ class PPTXGenerator:
         textbox = slide.shapes.add_textbox(left, top, width, height)
         text_frame = textbox.text_frame
         text_frame.word_wrap = True
-        text_frame.margin_left = Inches(0.15)
-        text_frame.margin_right = Inches(0.15)
-        text_frame.margin_top = Inches(0.15)
-        text_frame.margin_bottom = Inches(0.15)
+        text_frame.margin_left = self.TEXT_MARGIN
+        text_frame.margin_right = self.TEXT_MARGIN
+        text_frame.margin_top = self.TEXT_MARGIN
+        text_frame.margin_bottom = self.TEXT_MARGIN
         text_frame.vertical_anchor = MSO_ANCHOR.TOP
         text_frame.auto_size = None  # Disable auto-size for manual control
         
-        # Clear default paragraph
-        text_frame.clear()
+        # A new text box already holds exactly one empty paragraph, so there is nothing to clear
         
-        # Handle multi-line text - split by newlines and create paragraphs
-        lines = text.split('\n')
+        # Handle multi-line text - one paragraph per line, built as the lines are produced
+        last_index = text.count('\n')
+        font_size = font_size or self.FONT_SIZE_QUESTION
         
-        for i, line in enumerate(lines):
+        for i, run_specs in enumerate(self._iter_runs(text, bold)):
             if i > 0:
                 # Add new paragraph for each line break
                 paragraph = text_frame.add_paragraph()
@@ -151,72 +234,90 @@ class PPTXGenerator:
                 paragraph = text_frame.paragraphs[0]
             
             paragraph.alignment = alignment
-            paragraph.space_after = Pt(8) if i < len(lines) - 1 else Pt(0)
-            paragraph.space_before = Pt(0)
+            paragraph.space_after = self.PARAGRAPH_SPACING if i < last_index else self.NO_SPACING
+            paragraph.space_before = self.NO_SPACING
             
+            # New text box paragraphs have no <a:endParaRPr>, so runs go at the end
+            paragraph._p.extend(
+                self._build_run(run_text, font_size, run_bold) for run_text, run_bold in run_specs
+            )
+        
+        return text_frame
+    
+    @staticmethod
+    def _iter_runs(text: str, bold: bool):
+        """
+        Yield the runs of each line of text, one line at a time.
+        
+        Args:
+            text: Text content, one paragraph per line
+            bold: Whether regular text should be bold
+            
+        Yields:
+            Tuple of (run text, bold) pairs for one line
+        """
+        for line in text.split('\n'):
             # Check if line starts with Q1, Q2, Ans1, Ans2, etc. for bold formatting
-            line_stripped = line.strip()
-            is_numbered = (line_stripped.startswith('Q') and len(line_stripped) > 1 and line_stripped[1:2].isdigit()) or \
-                         (line_stripped.startswith('Ans') and len(line_stripped) > 3 and line_stripped[3:4].isdigit())
+            line_stripped = line.strip()  # Stripped once, reused for the empty-line check
+            match = _NUM_RE.match(line_stripped)
             
-            if is_numbered:
-                # Check if line already has a dot after the number (e.g., "Q1. text" or "Ans1. text")
-                # Find where the number ends
-                if line_stripped.startswith('Q'):
-                    # Q1, Q2, Q10, etc.
-                    num_end = 1
-                    while num_end < len(line_stripped) and line_stripped[num_end].isdigit():
-                        num_end += 1
-                    number_part = line_stripped[:num_end]
-                    rest = line_stripped[num_end:].strip()
-                else:  # Ans
-                    # Ans1, Ans2, Ans10, etc.
-                    num_end = 3
-                    while num_end < len(line_stripped) and line_stripped[num_end].isdigit():
-                        num_end += 1
-                    number_part = line_stripped[:num_end]
-                    rest = line_stripped[num_end:].strip()
-                
-                # Check if rest starts with a dot (already has dot)
-                if rest.startswith('.'):
-                    # Already has dot, remove it and any spaces after it
-                    text_part = rest.lstrip('.').lstrip().strip()
-                    separator = ". " if text_part else "."
-                elif rest.startswith(' '):
-                    # Has space but no dot - add dot before space
-                    text_part = rest.lstrip()
-                    separator = ". "
-                else:
-                    # No dot or space, add dot and space
-                    text_part = rest
-                    separator = ". "
-                
-                # Add bold number run
-                run1 = paragraph.add_run()
-                run1.text = number_part + separator
-                run1.font.name = self.FONT_NAME
-                run1.font.size = font_size or self.FONT_SIZE_QUESTION
-                run1.font.bold = True
-                run1.font.color.rgb = RGBColor(0, 0, 0)
+            if match:
+                prefix, number, dots, text_part = match.groups()
+                # Normalize to "Q1. text"; a number with only a dot after it stays "Q1."
+                separator = "." if dots and not text_part else ". "
                 
-                # Add regular text run
+                # Bold number run, then regular text run
                 if text_part:
-                    run2 = paragraph.add_run()
-                    run2.text = text_part
-                    run2.font.name = self.FONT_NAME
-                    run2.font.size = font_size or self.FONT_SIZE_QUESTION
-                    run2.font.bold = bold
-                    run2.font.color.rgb = RGBColor(0, 0, 0)
+                    yield (prefix + number + separator, True), (text_part, bold)
+                else:
+                    yield ((prefix + number + separator, True),)
             else:
-                # Regular line - add single run
-                run = paragraph.add_run()
-                run.text = line if line.strip() else " "  # Preserve empty lines
-                run.font.name = self.FONT_NAME
-                run.font.size = font_size or self.FONT_SIZE_QUESTION
-                run.font.bold = bold
-                run.font.color.rgb = RGBColor(0, 0, 0)
+                # Regular line - single run
+                yield ((line if line_stripped else " ", bold),)  # Preserve empty lines
+    
+    def _build_run(self, text: str, font_size: Pt, bold: bool = None, color: RGBColor = None):
+        """
+        Build a complete <a:r> element by copying a prototype run with the same
+        formatting, instead of setting each font property through python-pptx
+        (same XML as add_run() + font settings). Each prototype is parsed once.
         
-        return text_frame
+        Args:
+            text: Run text
+            font_size: Font size in Points
+            bold: Whether text should be bold (None leaves bold unset)
+            color: Text color (default: TEXT_COLOR)
+            
+        Returns:
+            CT_RegularTextRun element, ready to append to a paragraph
+        """
+        key = (font_size, bold, color)
+        prototype = self._run_prototypes.get(key)
+        if prototype is None:
+            bold_attr = "" if bold is None else f' b="{int(bold)}"'
+            prototype = self._run_prototypes[key] = parse_xml(
+                f'<a:r {nsdecls("a")}><a:rPr sz="{Emu(font_size).centipoints}"{bold_attr}>'
+                f'<a:solidFill><a:srgbClr val="{color or self.TEXT_COLOR}"/></a:solidFill>'
+                f'<a:latin typeface="{self.FONT_NAME}"/></a:rPr><a:t/></a:r>'
+            )
+        
+        run = copy.deepcopy(prototype)
+        run.text = text  # Escapes control characters like python-pptx does
+        return run
+    
+    def _build_cell_txBody(self, text: str, bold: bool = None):
+        """
+        Build a table cell <a:txBody> holding one centered run of text.
+        
+        Args:
+            text: Cell text
+            bold: Whether text should be bold (None leaves bold unset)
+            
+        Returns:
+            CT_TextBody element to put in an <a:tc>
+        """
+        txBody = parse_xml(f'<a:txBody {nsdecls("a")}><a:bodyPr/><a:lstStyle/><a:p><a:pPr algn="ctr"/></a:p></a:txBody>')
+        txBody.p_lst[0].append(self._build_run(text, self.FONT_SIZE_TABLE, bold))
+        return txBody
     
     def add_formatted_text(self, text_frame, text: str, font_size: Pt = None, 
                           bold: bool = False, color: RGBColor = None):
@@ -231,25 +332,22 @@ class PPTXGenerator:
             color: Text color (default: black)
         """
         if color is None:
-            color = RGBColor(0, 0, 0)
+            color = self.TEXT_COLOR
+        font_size = font_size or self.FONT_SIZE_QUESTION
         
         # Split by newlines to preserve line breaks
         lines = text.split('\n')
+        last_index = len(lines) - 1
         
         for i, line in enumerate(lines):
             # Add new paragraph for each line
             paragraph = text_frame.add_paragraph()
             paragraph.alignment = PP_ALIGN.LEFT
-            paragraph.space_after = Pt(8) if i < len(lines) - 1 else Pt(0)
-            paragraph.space_before = Pt(0)
+            paragraph.space_after = self.PARAGRAPH_SPACING if i < last_index else self.NO_SPACING
+            paragraph.space_before = self.NO_SPACING
             
             # Add run
-            run = paragraph.add_run()
-            run.text = line if line.strip() else " "
-            run.font.name = self.FONT_NAME
-            run.font.size = font_size or self.FONT_SIZE_QUESTION
-            run.font.bold = bold
-            run.font.color.rgb = color
+            paragraph._p.append(self._build_run(line if line.strip() else " ", font_size, bold, color))
     
     def add_table(self, slide, table_data: dict, left: Inches, top: Inches,
                   width: Inches = None, height: Inches = None):
@@ -294,40 +392,18 @@ class PPTXGenerator:
         for col_idx in range(num_cols):
             table.columns[col_idx].width = col_width
         
-        # Format header row
-        header_row = table.rows[0]
-        for col_idx, header_text in enumerate(headers):
-            cell = header_row.cells[col_idx]
-            cell.text_frame.clear()
-            paragraph = cell.text_frame.paragraphs[0]
-            paragraph.alignment = PP_ALIGN.CENTER
-            
-            run = paragraph.add_run()
-            run.text = str(header_text) if header_text else ""
-            run.font.name = self.FONT_NAME
-            run.font.size = self.FONT_SIZE_TABLE
-            run.font.bold = True
-            run.font.color.rgb = RGBColor(0, 0, 0)
+        # Fill cells by replacing each <a:txBody> with a prebuilt one (bold header, regular data)
+        tr_lst = table._tbl.tr_lst
+        for tc, header_text in zip(tr_lst[0].tc_lst, headers):
+            tc.replace(tc.txBody, self._build_cell_txBody(str(header_text) if header_text else "", bold=True))
             
             # Set cell fill color (light gray for headers)
-            cell.fill.solid()
-            cell.fill.fore_color.rgb = RGBColor(240, 240, 240)
-        
-        # Format data rows
-        for row_idx, row_data in enumerate(rows, 1):
-            table_row = table.rows[row_idx]
-            for col_idx, cell_text in enumerate(row_data):
-                if col_idx < num_cols:
-                    cell = table_row.cells[col_idx]
-                    cell.text_frame.clear()
-                    paragraph = cell.text_frame.paragraphs[0]
-                    paragraph.alignment = PP_ALIGN.CENTER
-                    
-                    run = paragraph.add_run()
-                    run.text = str(cell_text) if cell_text is not None else ""
-                    run.font.name = self.FONT_NAME
-                    run.font.size = self.FONT_SIZE_TABLE
-                    run.font.color.rgb = RGBColor(0, 0, 0)
+            tc.get_or_add_tcPr().append(copy.deepcopy(self.HEADER_FILL))
+        
+        for tr, row_data in zip(tr_lst[1:], rows):
+            # zip() drops any cells beyond num_cols
+            for tc, cell_text in zip(tr.tc_lst, row_data):
+                tc.replace(tc.txBody, self._build_cell_txBody(str(cell_text) if cell_text is not None else ""))
         
         return table
     
@@ -347,8 +423,14 @@ class PPTXGenerator:
         top = self.TEXTBOX_TOP
         width = self.TEXTBOX_WIDTH
         
+        # Pull every field used below in one pass
+        question_text, options, diagram, table = (
+            question_data.get(key, default) for key, default in (
+                ('question_text', ''), ('options', []), ('diagram_description', None), ('table', None)
+            )
+        )
+        
         # Build full question text with all components
-        question_text = question_data.get('question_text', '')
         # Question header without exam info
         question_header = f"{question_number}. {question_text}"
         
@@ -359,13 +441,11 @@ class PPTXGenerator:
         full_text_parts = [question_header]
         
         # Add options if present (without bullets for multiple choice)
-        options = question_data.get('options', [])
         if options:
-            options_text = "\n".join(opt for opt in options)
-            full_text_parts.append(options_text)
+            # Skip empty/None entries so they don't become blank lines
+            full_text_parts.append("\n".join(opt for opt in options if opt))
         
         # Add diagram note if present (just show [Diagram] instead of full description)
-        diagram = question_data.get('diagram_description')
         if diagram:
             full_text_parts.append("\n[Diagram]")
         
@@ -373,7 +453,6 @@ class PPTXGenerator:
         full_question = "\n\n".join(full_text_parts)
         
         # Check if we have a table
-        table = question_data.get('table')
         has_table = table and table.get('headers')
         
         # Determine if table is actually just options in table format
@@ -383,17 +462,12 @@ class PPTXGenerator:
             table_rows = table.get('rows', [])
             # Check if table rows match options pattern (e.g., first column has "(a)", "(b)", etc.)
             if table_rows and len(table_rows) == len(options):
-                # Check if first column of each row matches option labels
-                matches = 0
-                for i, row in enumerate(table_rows):
-                    if row and len(row) > 0:
-                        first_cell = str(row[0]).strip()
-                        # Check if it matches option label pattern like "(a)", "(b)", etc.
-                        if first_cell.startswith('(') and len(first_cell) >= 3 and first_cell[1:2].isalpha() and first_cell.endswith(')'):
-                            # Check if it matches the corresponding option
-                            option_label = options[i].strip()[:3] if len(options[i]) >= 3 else ""
-                            if first_cell.lower() == option_label.lower():
-                                matches += 1
+                # Count rows whose first cell is an option label like "(a)" that matches the start of the corresponding option
+                matches = sum(
+                    1 for opt, row in zip(options, table_rows)
+                    if row and _OPT_LABEL_RE.fullmatch(first_cell := str(row[0]).strip())
+                    and opt.strip()[:3].lower() == first_cell.lower()
+                )
                 
                 # If most rows match, it's likely an options table
                 if matches >= len(options) * 0.75:  # 75% match threshold
@@ -473,7 +547,52 @@ class PPTXGenerator:
             bold=False
         )
     
-    def generate(self, questions: list, output_file: str, include_answers: bool = True, start_question_number: int = 1):
+    def add_question_slides(self, q: dict, question_number: str, include_answers: bool = True):
+        """
+        Create all slides (passage, question, answer) for one question.
+        
+        Args:
+            q: Question dictionary
+            question_number: Display question number (e.g., "Q4")
+            include_answers: Whether to include answer slides (default: True)
+        """
+        slides = q.get('slides', [])
+        if not include_answers:
+            # Drop answer slides up front so the loop below never sees them
+            slides = [slide for slide in slides if slide.get('slide_type') != 'answer']
+        
+        # Get exam_info from question if available
+        exam_info = q.get('exam_info', '')
+        
+        # Process each slide for this question
+        for slide_data in slides:
+            slide_type = slide_data.get('slide_type')
+            content = slide_data.get('content', {})
+            
+            if slide_type == 'passage':
+                passage = content.get('passage', '')
+                self.create_passage_slide(passage)
+                
+            elif slide_type == 'question':
+                self.create_question_slide(content, question_number, exam_info)
+                
+            elif slide_type == 'answer':
+                answer_text = content.get('answer_text', '')
+                self.create_answer_slide(answer_text, question_number)
+    
+    def add_slide_tree(self, sp_tree_xml: bytes):
+        """
+        Append a blank slide and fill it with a shape tree built elsewhere
+        (see build_slide_trees()).
+        
+        Args:
+            sp_tree_xml: Serialized <p:spTree> of the slide
+        """
+        sp_tree = self.create_blank_slide().shapes._spTree
+        sp_tree[:] = list(parse_xml(sp_tree_xml))
+    
+    def generate(self, questions: list, output_file: str, include_answers: bool = True, start_question_number: int = 1,
+                 workers: int = None):
         """
         Generate PowerPoint presentation from parsed questions.
         
@@ -482,12 +601,15 @@ class PPTXGenerator:
             output_file: Path to output PPTX file
             include_answers: Whether to include answer slides (default: True)
             start_question_number: Starting question number (default: 1)
+            workers: Worker processes building slides (default: one per CPU for
+                     decks of PARALLEL_MIN_QUESTIONS or more questions, otherwise 1)
         """
         print("[INFO] Creating PowerPoint presentation...")
         if not include_answers:
             print("[INFO] Answer slides will be excluded from the presentation")
         
-        # Process each question
+        # Number every question up front so slides can be built in any process
+        numbered = []
         for q in questions:
             # Extract numeric value from existing question_number (e.g., "Q1" → 1)
             original_question_number = q.get('question_number', 'Q?')
@@ -502,35 +624,68 @@ class PPTXGenerator:
                 # Fallback: use index-based numbering if pattern doesn't match
                 question_index = questions.index(q)
                 question_number = f"Q{start_question_number + question_index}"
-            
-            slides = q.get('slides', [])
-            
-            # Get exam_info from question if available
-            exam_info = q.get('exam_info', '')
-            
-            # Process each slide for this question
-            for slide_data in slides:
-                slide_type = slide_data.get('slide_type')
-                content = slide_data.get('content', {})
-                
-                if slide_type == 'passage':
-                    passage = content.get('passage', '')
-                    self.create_passage_slide(passage)
-                    
-                elif slide_type == 'question':
-                    self.create_question_slide(content, question_number, exam_info)
-                    
-                elif slide_type == 'answer':
-                    # Skip answer slides if include_answers is False
-                    if include_answers:
-                        answer_text = content.get('answer_text', '')
-                        self.create_answer_slide(answer_text, question_number)
-                    # If include_answers is False, skip this slide entirely
+            numbered.append((q, question_number))
+        
+        if workers is None:
+            workers = 1
+            if len(questions) >= self.PARALLEL_MIN_QUESTIONS:
+                # CPUs this process may run on (falls back to the machine's count where unsupported)
+                workers = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+        workers = min(workers, len(numbered))
+        
+        slide_trees = None
+        if workers > 1:
+            # Contiguous chunks keep slide order; every question number passed to
+            # create_answer_slide matches Q<n>, so answer_counter is never needed across chunks
+            chunk_size = -(-len(numbered) // workers)
+            chunks = [numbered[i:i + chunk_size] for i in range(0, len(numbered), chunk_size)]
+            print(f"[INFO] Building slides for {len(numbered)} questions in {len(chunks)} worker processes...")
+            try:
+                with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                    slide_trees = [tree for trees in pool.map(build_slide_trees, chunks, repeat(include_answers))
+                                   for tree in trees]
+            except Exception as e:
+                print(f"[WARNING] Parallel slide building failed ({e}), building slides in this process")
+        
+        if slide_trees is not None:
+            for sp_tree_xml in slide_trees:
+                self.add_slide_tree(sp_tree_xml)
+        else:
+            for q, question_number in numbered:
+                self.add_question_slides(q, question_number, include_answers)
         
         # Save presentation
         Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-        self.prs.save(output_file)
+        self.save(output_file)
         print(f"[OK] Presentation saved to: {output_file}")
+    
+    def save(self, output_file: str):
+        """
+        Save the presentation like Presentation.save(), with faster compression
+        (SAVE_COMPRESS_LEVEL instead of zlib's default level).
+        
+        Args:
+            output_file: Path (or writable binary stream) for the PPTX file
+        """
+        package = self.prs.part.package
+        _FastPackageWriter.write(output_file, package._rels, tuple(package.iter_parts()))
+
+
+def build_slide_trees(numbered_questions: list, include_answers: bool = True) -> list:
+    """
+    Build slides for part of a deck in a worker process.
+    
+    Args:
+        numbered_questions: List of (question dictionary, question number) tuples
+        include_answers: Whether to include answer slides (default: True)
+        
+    Returns:
+        Serialized <p:spTree> of each slide, in order
+    """
+    generator = PPTXGenerator()
+    for q, question_number in numbered_questions:
+        generator.add_question_slides(q, question_number, include_answers)
+    return [etree.tostring(slide.shapes._spTree) for slide in generator.prs.slides]
 
 
 def load_parsed_questions(json_file: str) -> list:
@@ -544,19 +699,57 @@ def load_parsed_questions(json_file: str) -> list:
         List of question dictionaries, or None if error
     """
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            questions = json.load(f)
+        if orjson is not None:
+            questions = orjson.loads(Path(json_file).read_bytes())
+        else:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                questions = json.load(f)
         print(f"[OK] Loaded {len(questions)} questions from {json_file}")
         return questions
     except FileNotFoundError:
         print(f"[ERROR] File not found: {json_file}")
         print("[INFO] Please run Step 2 first to parse questions")
         return None
-    except json.JSONDecodeError as e:
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError is a subclass
         print(f"[ERROR] Failed to parse JSON: {e}")
         return None
 
 
+def get_unique_output_filename(base_name: str, folder: str = "PPTs") -> str:
+    """
+    Get a unique output filename, adding a timestamp suffix if the file exists.
+    The name is reserved by creating the file exclusively, so runs started in the
+    same second (or parallel batch items with the same name) never share a file;
+    the caller removes the empty file if generation fails.
+    
+    Args:
+        base_name: Base filename (without extension)
+        folder: Output folder name
+        
+    Returns:
+        Unique filename path
+    """
+    folder_path = Path(folder)
+    folder_path.mkdir(exist_ok=True)
+    
+    # Plain name, then a timestamp suffix; a random suffix only if both are taken
+    candidates = (
+        folder_path / f"{base_name}.pptx",
+        folder_path / f"{base_name}_{datetime.now():%Y%m%d_%H%M%S}.pptx",
+        folder_path / f"{base_name}_{uuid.uuid4().hex[:8]}.pptx",
+    )
+    for attempt, output_file in enumerate(candidates):
+        try:
+            with open(output_file, 'x'):  # Fails if the file already exists
+                pass
+        except FileExistsError:
+            continue
+        if attempt:
+            print(f"[INFO] Output file already exists, using: {output_file.name}")
+        return str(output_file)
+    raise FileExistsError(f"No free output filename for {base_name} in {folder}")
+
+
 def main():
     """Main execution function."""
     import sys
@@ -618,8 +811,10 @@ def main():
     
     # Verify output
     try:
-        verify_prs = Presentation(output_file)
-        num_slides = len(verify_prs.slides)
+        # Slides are counted in memory; the file only needs to exist and be non-empty
+        if not Path(output_file).stat().st_size:
+            raise ValueError("output file is empty")
+        num_slides = len(generator.prs.slides)
         print(f"\n[SUMMARY]")
         print(f"Total questions: {len(questions)}")
         print(f"Total slides generated: {num_slides}")
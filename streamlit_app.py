@@ -6,35 +6,38 @@ import streamlit as st
 from pathlib import Path
 import tempfile
 import os
+import io
 import time
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from PyPDF2 import PdfReader
 from step1_pdf_extraction import (
     get_api_key as get_api_key_step1,
-    extract_with_llm,
+    extract_with_llm_bytes,
     save_extracted_text
 )
 from step2_question_parsing import (
     get_api_key as get_api_key_step2,
-    load_extracted_content,
     parse_questions_with_llm,
+    extract_and_parse_with_llm,
     validate_questions,
     save_parsed_questions,
     create_preview
 )
 from step3_pptx_new import PPTXGenerator, load_parsed_questions
-from pptx import Presentation
 
+# Background pool for review files, so saving them overlaps with the next step
+_IO_POOL = ThreadPoolExecutor(max_workers=2)
 
-# Page configuration
-st.set_page_config(
-    page_title="PPT Generator from PDF",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Set once the output folders have been created (see get_output_dirs)
+_dirs_ready = False
+
+# Extract and parse small PDFs in one Claude request (set to False to debug the two steps separately)
+COMBINED_LLM_CALL = True
 
-# Custom CSS for better styling
-st.markdown("""
+# Custom CSS, defined once at module level
+CUSTOM_CSS = """
     <style>
     .main-header {
         font-size: 2.5rem;
@@ -50,7 +53,18 @@ st.markdown("""
         margin: 1rem 0;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+# Page configuration
+st.set_page_config(
+    page_title="PPT Generator from PDF",
+    page_icon="📊",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS for better styling (re-sent on every rerun: Streamlit drops elements a rerun doesn't emit)
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # Title
 st.markdown('<h1 class="main-header">📊 PPT Generator from PDF</h1>', unsafe_allow_html=True)
@@ -81,22 +95,82 @@ with st.sidebar:
 def get_api_key_from_secrets():
     """
     Get API key from Streamlit secrets or fallback to existing methods.
+    The first key found is remembered for the rest of the session.
     
     Returns:
         API key string, or None if not found
     """
+    if st.session_state.get('api_key'):
+        return st.session_state['api_key']
+    
     try:
         # Try Streamlit secrets first (for Streamlit Cloud)
         if hasattr(st, 'secrets') and 'anthropic' in st.secrets:
             api_key = st.secrets['anthropic']['api_key']
             if api_key:
+                st.session_state['api_key'] = api_key
                 return api_key
     except:
         pass
     
     # Fallback to existing methods (config.yaml or environment variable)
     api_key = get_api_key_step1()
-    return api_key if api_key else None
+    if not api_key:
+        return None
+    st.session_state['api_key'] = api_key
+    return api_key
+
+
+def get_output_dirs() -> tuple:
+    """
+    Create the output folders on the first call only.
+    A folder removed later is recreated where it is used (see _retry_in_dir).
+    
+    Returns:
+        Tuple of (output_dir: Path, ppt_dir: Path)
+    """
+    global _dirs_ready
+    output_dir = Path("output")
+    ppt_dir = Path("PPTs")
+    if not _dirs_ready:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        ppt_dir.mkdir(parents=True, exist_ok=True)
+        _dirs_ready = True
+    return output_dir, ppt_dir
+
+
+def _retry_in_dir(directory: Path, func, *args, **kwargs):
+    """
+    Call func; if it fails because directory was removed, recreate it and retry once.
+    
+    Args:
+        directory: Folder the call writes into
+        func: Function to call
+        *args, **kwargs: Arguments for func
+        
+    Returns:
+        Whatever func returns
+    """
+    try:
+        return func(*args, **kwargs)
+    except FileNotFoundError:
+        directory.mkdir(parents=True, exist_ok=True)
+        return func(*args, **kwargs)
+
+
+@st.cache_data(show_spinner=False)
+def get_pdf_page_count(pdf_bytes: bytes) -> int:
+    """
+    Count the pages of an uploaded PDF.
+    Cached on the file content, so widget reruns don't re-parse the PDF.
+    
+    Args:
+        pdf_bytes: PDF file content
+        
+    Returns:
+        Number of pages
+    """
+    return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
 
 
 def save_uploaded_file(uploaded_file, temp_dir):
@@ -112,29 +186,15 @@ def save_uploaded_file(uploaded_file, temp_dir):
     """
     try:
         file_path = Path(temp_dir) / uploaded_file.name
+        uploaded_file.seek(0)  # Copy from the start even if the upload was read before
         with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+            shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)  # Stream in 1 MB blocks
         return str(file_path)
     except Exception as e:
         st.error(f"Error saving file: {e}")
         return None
 
 
-def cleanup_temp_files(temp_dir):
-    """
-    Clean up temporary files and directory.
-    
-    Args:
-        temp_dir: Temporary directory path
-    """
-    try:
-        import shutil
-        if Path(temp_dir).exists():
-            shutil.rmtree(temp_dir)
-    except Exception as e:
-        st.warning(f"Could not clean up temporary files: {e}")
-
-
 def process_multiple_pdfs_streamlit(pdf_paths: list[str], include_answers: bool = True, start_question_number: int = 1, extract_year: bool = False):
     """Process multiple PDFs in Streamlit with progress updates."""
     from generate_ppt_from_multiple_pdfs import (
@@ -164,8 +224,7 @@ def process_multiple_pdfs_streamlit(pdf_paths: list[str], include_answers: bool
             return
         
         # Save parsed questions
-        output_dir = Path("output")
-        output_dir.mkdir(exist_ok=True)
+        output_dir, _ = get_output_dirs()
         questions_file = output_dir / f"parsed_questions_{first_pdf_name}.json"
         save_parsed_questions(questions, str(questions_file))
         
@@ -198,28 +257,27 @@ def process_multiple_pdfs_streamlit(pdf_paths: list[str], include_answers: bool
         answer_status = "Included" if include_answers else "Excluded"
         st.metric("Answer Slides", answer_status)
     
-    # Download button
+    # Download button (Streamlit reads the open file itself - no separate bytes copy)
     with open(output_file, "rb") as f:
-        pptx_bytes = f.read()
-    
-    st.download_button(
-        label="📥 Download PowerPoint",
-        data=pptx_bytes,
-        file_name=Path(output_file).name,
-        mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-        type="primary",
-        use_container_width=True
-    )
+        st.download_button(
+            label="📥 Download PowerPoint",
+            data=f,
+            file_name=Path(output_file).name,
+            mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+            type="primary",
+            use_container_width=True
+        )
     
     st.success(f"🎉 Your presentation is ready! Click the button above to download.")
 
 
-def process_pdf(pdf_path: str, include_answers: bool = True, progress_container=None, start_question_number: int = 1, extract_year: bool = False):
+def process_pdf(pdf_filename: str, pdf_bytes: bytes, include_answers: bool = True, progress_container=None, start_question_number: int = 1, extract_year: bool = False):
     """
     Process PDF through all three steps and generate PPTX.
     
     Args:
-        pdf_path: Path to PDF file
+        pdf_filename: File name of the uploaded PDF (used for output naming)
+        pdf_bytes: PDF file content
         include_answers: Whether to include answer slides
         progress_container: Streamlit container for progress updates
         start_question_number: Starting question number (default: 1)
@@ -231,7 +289,7 @@ def process_pdf(pdf_path: str, include_answers: bool = True, progress_container=
     stats = {
         'questions': 0,
         'slides': 0,
-        'pdf_name': Path(pdf_path).stem
+        'pdf_name': Path(pdf_filename).stem
     }
     
     # Get API key
@@ -246,23 +304,26 @@ def process_pdf(pdf_path: str, include_answers: bool = True, progress_container=
         with progress_container.status("📄 **Step 1: Extracting content from PDF...**", state="running"):
             progress_container.write("Sending PDF to Claude API... This may take 30-60 seconds.")
     
-    extracted_text = extract_with_llm(pdf_path, api_key, extract_year)
+    extracted_text = questions = None
+    if COMBINED_LLM_CALL:
+        # Falls back to the separate steps below (returns None) for large PDFs or on failure
+        extracted_text, questions = extract_and_parse_with_llm(pdf_filename, api_key, extract_year, pdf_bytes)
+    if not extracted_text:
+        extracted_text = extract_with_llm_bytes(pdf_bytes, pdf_filename, api_key, extract_year)
     if not extracted_text:
         if progress_container:
             progress_container.error("❌ Failed to extract content from PDF")
         return False, None, stats
     
-    # Save extracted text
-    pdf_name = Path(pdf_path).stem
-    output_dir = Path("output")
-    output_dir.mkdir(exist_ok=True)
+    # Save extracted text in the background (Step 2 uses the text in memory)
+    pdf_name = stats['pdf_name']
+    output_dir, ppt_dir = get_output_dirs()
     output_file = output_dir / f"extracted_pdf_content_{pdf_name}.txt"
-    save_extracted_text(extracted_text, str(output_file))
+    pending_writes = [_IO_POOL.submit(save_extracted_text, extracted_text, str(output_file))]
     
     # Save PDF name for next steps
     pdf_name_file = output_dir / "current_pdf_name.txt"
-    with open(pdf_name_file, 'w', encoding='utf-8') as f:
-        f.write(pdf_name)
+    pending_writes.append(_IO_POOL.submit(_retry_in_dir, output_dir, pdf_name_file.write_text, pdf_name, 'utf-8'))
     
     if progress_container:
         progress_container.success(f"✅ Step 1 complete: {len(extracted_text):,} characters extracted")
@@ -272,13 +333,8 @@ def process_pdf(pdf_path: str, include_answers: bool = True, progress_container=
         with progress_container.status("🔍 **Step 2: Parsing questions...**", state="running"):
             progress_container.write("Analyzing content and structuring questions... This may take 30-60 seconds.")
     
-    content = load_extracted_content(str(output_file))
-    if not content:
-        if progress_container:
-            progress_container.error("❌ Failed to load extracted content")
-        return False, None, stats
-    
-    questions = parse_questions_with_llm(content, api_key, extract_year)
+    if not questions:
+        questions = parse_questions_with_llm(extracted_text, api_key, extract_year)
     if not questions:
         if progress_container:
             progress_container.error("❌ Failed to parse questions")
@@ -287,14 +343,12 @@ def process_pdf(pdf_path: str, include_answers: bool = True, progress_container=
     # Validate questions
     is_valid, issues, validation_stats = validate_questions(questions)
     
-    # Save parsed questions
+    # Save parsed questions in the background (Step 3 uses the list in memory)
     parsed_file = output_dir / f"parsed_questions_{pdf_name}.json"
-    save_parsed_questions(questions, str(parsed_file))
+    pending_writes.append(_IO_POOL.submit(save_parsed_questions, questions, str(parsed_file)))
     
     stats['questions'] = validation_stats['total_questions']
-    stats['slides'] = validation_stats['total_slides'] if include_answers else sum(
-        1 for q in questions for slide in q.get('slides', []) if slide.get('slide_type') != 'answer'
-    )
+    stats['slides'] = validation_stats['total_slides' if include_answers else 'non_answer_slides']
     
     if progress_container:
         if issues:
@@ -307,25 +361,30 @@ def process_pdf(pdf_path: str, include_answers: bool = True, progress_container=
         with progress_container.status("📊 **Step 3: Generating PowerPoint...**", state="running"):
             progress_container.write("Creating presentation slides...")
     
-    # Get unique output filename
-    ppt_dir = Path("PPTs")
-    ppt_dir.mkdir(exist_ok=True)
-    output_pptx = ppt_dir / f"{pdf_name}.pptx"
-    
-    # Handle existing files
-    counter = 1
-    while output_pptx.exists():
-        output_pptx = ppt_dir / f"{pdf_name}_{counter}.pptx"
-        counter += 1
+    # Get unique output filename - created atomically, so concurrent sessions never share a file
+    fd, output_pptx = _retry_in_dir(ppt_dir, tempfile.mkstemp, prefix=f"{pdf_name}_", suffix=".pptx", dir=ppt_dir)
+    os.close(fd)  # The generator reopens the file by name
     
     # Generate PPTX
     generator = PPTXGenerator()
     generator.generate(questions, str(output_pptx), include_answers=include_answers, start_question_number=start_question_number)
     
+    # Make sure the review files were written before reporting success
+    for future in pending_writes:
+        try:
+            future.result()
+        except Exception as e:
+            if progress_container:
+                progress_container.warning(f"⚠️ Could not save intermediate file: {e}")
+    
     # Verify output
     try:
-        verify_prs = Presentation(str(output_pptx))
-        num_slides = len(verify_prs.slides)
+        # A .pptx is a ZIP archive - count slide parts without parsing any XML
+        with zipfile.ZipFile(output_pptx) as pptx_zip:
+            num_slides = sum(
+                1 for name in pptx_zip.namelist()
+                if name.startswith('ppt/slides/slide') and name.endswith('.xml')
+            )
         stats['slides'] = num_slides
         
         if progress_container:
@@ -350,7 +409,7 @@ def main():
     
     if uploaded_file:
         # Show file info
-        file_size_mb = len(uploaded_file.getbuffer()) / (1024 * 1024)
+        file_size_mb = uploaded_file.size / (1024 * 1024)
         col1, col2 = st.columns(2)
         with col1:
             st.info(f"**File:** {uploaded_file.name}")
@@ -360,16 +419,11 @@ def main():
         # Get page count
         total_pages = None
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                tmp_file.write(uploaded_file.getbuffer())
-                tmp_path = tmp_file.name
-                reader = PdfReader(tmp_path)
-                total_pages = len(reader.pages)
-                os.unlink(tmp_path)
-                
-                st.info(f"**Pages:** {total_pages}")
-                if total_pages > 50:
-                    st.warning("⚠️ Large PDF detected. Consider using split feature for better results.")
+            total_pages = get_pdf_page_count(uploaded_file.getvalue())
+            
+            st.info(f"**Pages:** {total_pages}")
+            if total_pages > 50:
+                st.warning("⚠️ Large PDF detected. Consider using split feature for better results.")
         except Exception as e:
             st.warning(f"Could not read PDF page count: {e}")
             # Set total_pages to a default value so split input can still appear
@@ -461,16 +515,15 @@ def main():
     
     if uploaded_file:
         if st.button("🚀 Generate PPT", type="primary", use_container_width=True):
-            # Create temporary directory for uploaded file
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Save uploaded file
-                pdf_path = save_uploaded_file(uploaded_file, temp_dir)
-                if not pdf_path:
-                    st.error("Failed to save uploaded file. Please try again.")
-                    return
-                
-                # Handle PDF splitting if enabled
-                if use_split and split_pages:
+            # Handle PDF splitting if enabled
+            if use_split and split_pages:
+                # Splitting writes page-range files, so the upload is saved to a temporary directory
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    pdf_path = save_uploaded_file(uploaded_file, temp_dir)
+                    if not pdf_path:
+                        st.error("Failed to save uploaded file. Please try again.")
+                        return
+                    
                     try:
                         from step1_pdf_extraction import split_pdf_at_pages
                         
@@ -485,7 +538,7 @@ def main():
                             status.write(f"✅ Created {len(split_files)} chunks")
                             status.update(state="complete")
                         
-                        # Process using multi-PDF workflow
+                        # Process using multi-PDF workflow (it shows its own results)
                         process_multiple_pdfs_streamlit(
                             split_files,
                             include_answers=include_answers,
@@ -495,50 +548,50 @@ def main():
                     except Exception as e:
                         st.error(f"❌ Error during PDF splitting: {e}")
                         st.exception(e)
-                else:
-                    # Normal single PDF processing
-                    # Create progress container
-                    progress_container = st.container()
-                    
-                    # Process PDF
-                    success, output_file, stats = process_pdf(
-                        pdf_path,
-                        include_answers=include_answers,
-                        progress_container=progress_container,
-                        start_question_number=int(start_number),
-                        extract_year=extract_year
-                    )
+                return
+            
+            # Normal single PDF processing - the upload is sent from memory, no temporary file
+            # Create progress container
+            progress_container = st.container()
+            
+            # Process PDF
+            success, output_file, stats = process_pdf(
+                uploaded_file.name,
+                uploaded_file.getvalue(),
+                include_answers=include_answers,
+                progress_container=progress_container,
+                start_question_number=int(start_number),
+                extract_year=extract_year
+            )
+            
+            if success and output_file:
+                st.markdown("---")
+                st.header("✅ Generation Complete!")
                 
-                if success and output_file:
-                    st.markdown("---")
-                    st.header("✅ Generation Complete!")
-                    
-                    # Show summary
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Questions", stats['questions'])
-                    with col2:
-                        st.metric("Slides", stats['slides'])
-                    with col3:
-                        answer_status = "Included" if include_answers else "Excluded"
-                        st.metric("Answer Slides", answer_status)
-                    
-                    # Download button
-                    with open(output_file, "rb") as f:
-                        pptx_bytes = f.read()
-                    
+                # Show summary
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Questions", stats['questions'])
+                with col2:
+                    st.metric("Slides", stats['slides'])
+                with col3:
+                    answer_status = "Included" if include_answers else "Excluded"
+                    st.metric("Answer Slides", answer_status)
+                
+                # Download button (Streamlit reads the open file itself - no separate bytes copy)
+                with open(output_file, "rb") as f:
                     st.download_button(
                         label="📥 Download PowerPoint",
-                        data=pptx_bytes,
-                        file_name=Path(output_file).name,
+                        data=f,
+                        file_name=f"{stats['pdf_name']}.pptx",  # On-disk name has a unique suffix
                         mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
                         type="primary",
                         use_container_width=True
                     )
-                    
-                    st.success(f"🎉 Your presentation is ready! Click the button above to download.")
-                else:
-                    st.error("❌ Failed to generate presentation. Please check the error messages above and try again.")
+                
+                st.success(f"🎉 Your presentation is ready! Click the button above to download.")
+            else:
+                st.error("❌ Failed to generate presentation. Please check the error messages above and try again.")
     else:
         st.info("👆 Please upload a PDF file to get started.")
 
@@ -0,0 +1,47 @@
+"""
+Tests for command-line input handling in generate_ppt_from_pdf.py.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import generate_ppt_from_pdf
+from generate_ppt_from_pdf import PipelineCtx, get_unique_output_filename, is_batch_input, run_step3
+
+
+def test_bracketed_filename_is_single_input(tmp_path):
+    pdf = tmp_path / "CBSE [2023].pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    assert not is_batch_input(str(pdf))
+
+
+def test_directory_and_glob_are_batch_input(tmp_path):
+    assert is_batch_input(str(tmp_path))
+    assert is_batch_input(str(tmp_path / "*.pdf"))
+
+
+def test_missing_plain_filename_is_single_input(tmp_path):
+    assert not is_batch_input(str(tmp_path / "paper.pdf"))
+
+
+def test_unique_output_filename_never_reuses_a_name(tmp_path):
+    names = [get_unique_output_filename("paper", str(tmp_path)) for _ in range(4)]
+    
+    assert len(set(names)) == 4
+    assert Path(names[0]).name == "paper.pptx"
+    assert all(Path(name).exists() for name in names)
+
+
+def test_failed_generation_frees_the_reserved_name(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    
+    class FailingGenerator:
+        def generate(self, *args, **kwargs):
+            raise RuntimeError("boom")
+    
+    monkeypatch.setattr(generate_ppt_from_pdf, "PPTXGenerator", FailingGenerator)
+    questions = [{"question_number": "Q1", "slides": [{"slide_type": "question"}]}]
+    
+    assert run_step3(PipelineCtx.from_pdf("paper.pdf"), questions=questions) is None
+    assert not (tmp_path / "PPTs" / "paper.pptx").exists()
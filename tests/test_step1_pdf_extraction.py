@@ -0,0 +1,103 @@
+"""
+Tests for how Step 1 sends PDFs to Claude (the Claude API is faked).
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from anthropic import APIConnectionError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import step1_pdf_extraction as step1
+
+
+class FakeStream:
+    """Stands in for client.messages.stream(); streams one canned text response."""
+
+    def __init__(self, text):
+        self.text_stream = [text]
+        self.text = text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get_final_message(self):
+        return SimpleNamespace(stop_reason="end_turn", content=[SimpleNamespace(text=self.text)])
+
+
+class FakeClient:
+    """Fake Anthropic client whose first streaming request fails with a connection error."""
+
+    def __init__(self):
+        self.uploads = []
+        self.deleted = []
+        self.requests = []
+
+        def stream(**request):
+            self.requests.append(request)
+            if len(self.requests) == 1:
+                raise APIConnectionError(request=None)
+            return FakeStream("extracted text")
+
+        def upload(file, betas):
+            self.uploads.append(file)
+            return SimpleNamespace(id=f"file_{len(self.uploads)}")
+
+        def delete(file_id, betas):
+            self.deleted.append(file_id)
+
+        self.messages = SimpleNamespace(stream=stream)
+        self.beta = SimpleNamespace(messages=self.messages, files=SimpleNamespace(upload=upload, delete=delete))
+
+
+def make_extractor(client):
+    extractor = step1.PDFExtractor.__new__(step1.PDFExtractor)
+    extractor.client = client
+    return extractor
+
+
+def document_source(request):
+    return request["messages"][0]["content"][1]["source"]
+
+
+def test_large_pdf_is_uploaded_once_and_reused_by_retries(monkeypatch):
+    monkeypatch.setattr(step1, "FILES_API_MIN_BYTES", 10)
+    monkeypatch.setattr(step1, "_retry_wait_seconds", lambda e, attempt: 0)
+    client = FakeClient()
+
+    text, _ = make_extractor(client)._stream_pdf_extraction("paper.pdf", b"%PDF-1.4 large", "Extract")
+
+    assert text == "extracted text"
+    assert len(client.uploads) == 1
+    assert [document_source(r) for r in client.requests] == [{"type": "file", "file_id": "file_1"}] * 2
+    assert all(r["betas"] == [step1.FILES_API_BETA] for r in client.requests)
+    assert client.deleted == ["file_1"]
+
+
+def test_small_pdf_is_sent_inline(monkeypatch):
+    monkeypatch.setattr(step1, "_retry_wait_seconds", lambda e, attempt: 0)
+    client = FakeClient()
+
+    text, _ = make_extractor(client)._stream_pdf_extraction("paper.pdf", b"%PDF-1.4 small", "Extract")
+
+    assert text == "extracted text"
+    assert client.uploads == [] and client.deleted == []
+    assert document_source(client.requests[-1])["type"] == "base64"
+    assert "betas" not in client.requests[-1]
+
+
+def test_missing_api_key_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(step1, "_api_key", "")
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    assert step1.get_api_key() == ""
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test")
+    assert step1.get_api_key() == "sk-test"
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY")
+    assert step1.get_api_key() == "sk-test"  # Found keys are cached
@@ -0,0 +1,137 @@
+"""
+Tests for Step 2 request sizing and truncation handling (the Claude API is faked).
+"""
+import io
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from PyPDF2 import PdfWriter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import step2_question_parsing as step2
+
+
+QUESTIONS = [{"question_number": "Q1", "question_type": "regular",
+              "slides": [{"slide_type": "question", "content": {"question_text": "What?"}}]}]
+
+
+class FakeStream:
+    """Stands in for client.messages.stream(); returns one canned final message."""
+    
+    def __init__(self, message):
+        self.message = message
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def __iter__(self):
+        return iter(())
+    
+    def get_final_message(self):
+        return self.message
+
+
+class FakeClient:
+    """Fake Anthropic client; respond(request) returns (stop_reason, tool input)."""
+    
+    def __init__(self, respond):
+        self.requests = []
+        
+        def stream(**request):
+            self.requests.append(request)
+            stop_reason, tool_input = respond(request)
+            block = SimpleNamespace(type="tool_use", name=request["tool_choice"]["name"], input=tool_input)
+            return FakeStream(SimpleNamespace(stop_reason=stop_reason, content=[block]))
+        
+        self.messages = SimpleNamespace(stream=stream)
+
+
+def test_estimate_has_headroom():
+    content = "x" * 20000
+    assert step2.estimate_max_tokens(content) > len(content) / step2.CHARS_PER_OUTPUT_TOKEN
+    assert step2.estimate_max_tokens(content * 10) == step2.PARSE_MAX_TOKENS
+
+
+def test_truncated_chunk_is_retried_at_limit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Keep the LLM cache out of the repo
+    
+    def respond(request):
+        if request["max_tokens"] < step2.PARSE_MAX_TOKENS:
+            return "max_tokens", {}
+        return "tool_use", {"questions": QUESTIONS}
+    
+    client = FakeClient(respond)
+    monkeypatch.setattr(step2, "get_client", lambda api_key: client)
+    
+    assert step2.parse_questions_with_llm("Q1. What?", "key") == QUESTIONS
+    assert [r["max_tokens"] for r in client.requests] == [
+        step2.estimate_max_tokens("Q1. What?"), step2.PARSE_MAX_TOKENS
+    ]
+
+
+def make_pdf(num_pages: int) -> bytes:
+    """Build a PDF of blank pages in memory."""
+    writer = PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(100, 100)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_combined_call_keeps_text_when_truncated_in_questions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Partial tool input as the SDK decodes it: the text is complete, the questions are cut off
+    client = FakeClient(lambda request: ("max_tokens", {"extracted_text": "Q1. What?", "questions": [{}]}))
+    monkeypatch.setattr(step2, "get_client", lambda api_key: client)
+    
+    assert step2.extract_and_parse_with_llm("a.pdf", "key", pdf_bytes=make_pdf(1)) == ("Q1. What?", None)
+
+
+def test_combined_call_falls_back_when_truncated_in_text(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakeClient(lambda request: ("max_tokens", {}))
+    monkeypatch.setattr(step2, "get_client", lambda api_key: client)
+    
+    assert step2.extract_and_parse_with_llm("a.pdf", "key", pdf_bytes=make_pdf(1)) == (None, None)
+
+
+def test_combined_call_skipped_for_large_pdf(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakeClient(lambda request: ("tool_use", {"extracted_text": "x", "questions": QUESTIONS}))
+    monkeypatch.setattr(step2, "get_client", lambda api_key: client)
+    
+    pdf_bytes = make_pdf(step2.COMBINED_MAX_PAGES + 1)
+    assert step2.extract_and_parse_with_llm("a.pdf", "key", pdf_bytes=pdf_bytes) == (None, None)
+    assert client.requests == []
+
+
+def test_failed_config_and_missing_key_are_not_cached(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(step2, "_config", None)
+    monkeypatch.setattr(step2, "_api_key", "")
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    assert step2._load_config() is None
+    assert step2.get_api_key() == ""
+    
+    (tmp_path / "config.yaml").write_text("llm:\n  api_key: sk-config\n")
+    assert step2.get_api_key() == "sk-config"
+    
+    (tmp_path / "config.yaml").unlink()
+    assert step2.get_api_key() == "sk-config"  # Found keys are cached
+
+
+def test_save_helpers_create_a_missing_output_directory(tmp_path):
+    output_dir = tmp_path / "output"
+    
+    step2.save_parsed_questions(QUESTIONS, str(output_dir / "parsed.json"))
+    step2.create_preview(QUESTIONS, str(output_dir / "sub" / "preview.txt"))
+    
+    assert json.loads((output_dir / "parsed.json").read_text(encoding="utf-8")) == QUESTIONS
+    assert "Q1" in (output_dir / "sub" / "preview.txt").read_text(encoding="utf-8")
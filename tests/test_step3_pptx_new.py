@@ -0,0 +1,101 @@
+"""
+Tests for Step 3 PPTX generation.
+"""
+import os
+import sys
+import zipfile
+from pathlib import Path
+
+from pptx import Presentation
+from pptx.util import Inches
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from step3_pptx_new import PPTXGenerator
+
+
+def test_textbox_geometry_matches_canva_derivation():
+    assert PPTXGenerator.TEXTBOX_LEFT == 390429
+    assert PPTXGenerator.TEXTBOX_TOP == 946081
+    assert PPTXGenerator.TEXTBOX_WIDTH == 11437544
+    assert PPTXGenerator.TEXTBOX_HEIGHT == 3433904
+    
+    # Canva px × scale × correction, as documented next to the constants
+    assert PPTXGenerator.TEXTBOX_LEFT == Inches(73.6 * (13.333 / 1920) * (73.6 / 88.1))
+    assert PPTXGenerator.TEXTBOX_TOP == Inches(162.3 * (7.5 / 1080) * (162.3 / 176.8))
+    assert PPTXGenerator.TEXTBOX_WIDTH == Inches(1773.3 * (13.333 / 1920) * (1773.3 / 1745.8))
+    assert PPTXGenerator.TEXTBOX_HEIGHT == Inches(510.7 * (7.5 / 1080) * (510.7 / 482.3))
+
+
+def make_questions(count: int) -> list:
+    """Build a mix of regular, multiple choice, passage and table questions."""
+    questions = []
+    for n in range(1, count + 1):
+        slides = []
+        if n % 3 == 0:
+            slides.append({"slide_type": "passage", "content": {"passage": f"Passage for question {n}."}})
+        content = {"question_text": f"Question {n} text?"}
+        if n % 2 == 0:
+            content["options"] = [f"(a) {n}", f"(b) {n + 1}", "", f"(c) {n + 2}"]
+        if n % 4 == 0:
+            content["table"] = {"headers": ["x", "y"], "rows": [[str(n), f"**{n * 2}**"]]}
+        slides.append({"slide_type": "question", "content": content})
+        slides.append({"slide_type": "answer", "content": {"answer_text": f"Answer {n}"}})
+        questions.append({"question_number": f"Q{n}", "question_type": "regular", "slides": slides})
+    return questions
+
+
+def slide_texts(pptx_file: str) -> list:
+    """Read back every slide's text (text boxes and table cells) with stock python-pptx."""
+    texts = []
+    for slide in Presentation(pptx_file).slides:
+        shapes = []
+        for shape in slide.shapes:
+            if shape.has_text_frame:
+                shapes.append(shape.text_frame.text)
+            elif shape.has_table:
+                shapes.append([cell.text for row in shape.table.rows for cell in row.cells])
+        texts.append(shapes)
+    return texts
+
+
+def test_parallel_build_matches_serial(tmp_path, monkeypatch, capsys):
+    questions = make_questions(12)
+    serial_file = str(tmp_path / "serial.pptx")
+    parallel_file = str(tmp_path / "parallel.pptx")
+    
+    PPTXGenerator().generate(questions, serial_file, start_question_number=5, workers=1)
+    # Default worker count, as in production: lowered threshold and three CPUs
+    monkeypatch.setattr(PPTXGenerator, "PARALLEL_MIN_QUESTIONS", 2)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1, 2}, raising=False)
+    PPTXGenerator().generate(questions, parallel_file, start_question_number=5)
+    
+    output = capsys.readouterr().out
+    assert "in 3 worker processes" in output
+    assert "Parallel slide building failed" not in output
+    
+    serial = slide_texts(serial_file)
+    assert len(serial) == 12 * 2 + 4  # Question and answer per question, plus 4 passages
+    assert serial[0] == ["Q5. Question 1 text?"]
+    assert slide_texts(parallel_file) == serial
+
+
+def test_saved_deck_reopens_with_stock_python_pptx(tmp_path):
+    output_file = str(tmp_path / "deck.pptx")
+    generator = PPTXGenerator()
+    generator.generate(make_questions(5), output_file, include_answers=False, workers=1)
+    
+    with zipfile.ZipFile(output_file) as pptx_zip:
+        assert pptx_zip.testzip() is None
+    
+    prs = Presentation(output_file)
+    slides = list(prs.slides)
+    assert len(slides) == 5 + 1  # One question slide per question, plus 1 passage
+    assert [slide.part.partname for slide in slides] == [f"/ppt/slides/slide{n}.xml" for n in range(1, 7)]
+    slide_ids = [slide.slide_id for slide in slides]
+    assert slide_ids == sorted(set(slide_ids))
+    
+    # Slides added after reopening continue the same numbering
+    prs.slides.add_slide(prs.slide_layouts[6])
+    prs.save(output_file)
+    assert len(Presentation(output_file).slides) == 7